@@ -0,0 +1,217 @@
+"""
+UsrR16 client benchmarks
+
+Runs every operation against local UsrR16Simulator and reports
+p50/p95/p99 latency and throughput, results are written as JSON.
+
+    python benchmarks/bench_client.py --iterations 2000 --output bench.json
+
+Compare two runs to spot regressions:
+
+    python benchmarks/bench_client.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import usrr16                                   # noqa: E402
+from usrr16 import UsrR16, RelayMask            # noqa: E402
+from usrr16.codec import FrameDecoder           # noqa: E402
+from usrr16.simulator import UsrR16Simulator    # noqa: E402
+from usrr16.transport import LoopbackTransport  # noqa: E402
+
+STATE_REPLY = b'\xaa\x55\x00\x04\x00\x8a\x08\x01\x97'
+
+
+def percentile(samples: list, q: float) -> float:
+    """
+    Nearest-rank percentile of sorted samples
+
+    :param samples: list
+        Sorted samples
+    :param q: float
+        Percentile, 0-100
+    :return: float
+    """
+
+    index = max(0, min(len(samples) - 1, round(q / 100 * len(samples) + 0.5) - 1))
+    return samples[index]
+
+
+def measure(fn, iterations: int, warmup: int = 50) -> dict:
+    """
+    Call fn() `iterations` times and collect latency stats
+
+    :param fn: callable
+        Operation to measure, called without arguments
+    :param iterations: int
+        Number of measured calls
+    :param warmup: int
+        Number of calls before measuring
+    :return: dict
+        Latencies in microseconds and ops per second
+    """
+
+    clock = time.perf_counter_ns
+
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    started = clock()
+    for _ in range(iterations):
+        t0 = clock()
+        fn()
+        samples.append(clock() - t0)
+    elapsed = clock() - started
+
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'p50_us': percentile(samples, 50) / 1000,
+        'p95_us': percentile(samples, 95) / 1000,
+        'p99_us': percentile(samples, 99) / 1000,
+        'max_us': samples[-1] / 1000,
+        'ops_per_sec': iterations / (elapsed / 1e9),
+    }
+
+
+def codec_cases() -> dict:
+    """
+    Pure encode / decode operations, no I/O
+    """
+
+    decoder = FrameDecoder()
+
+    def decode_stream():
+        decoder.feed(STATE_REPLY)
+        return RelayMask.from_reply(decoder.next_frame())
+
+    return {
+        'encode.req_gen': lambda: UsrR16.req_gen(relay=7, command=2),
+        'decode.state_reply': lambda: RelayMask.from_reply(STATE_REPLY),
+        'decode.frame_decoder': decode_stream,
+    }
+
+
+def client_cases(r16: UsrR16) -> dict:
+    """
+    Operations doing a round-trip to the device
+    """
+
+    def state_16():
+        for rel in range(1, 17):
+            r16.state(rel)
+
+    return {
+        'client.turn_on': lambda: r16.turn_on(5),
+        'client.turn_off': lambda: r16.turn_off(5),
+        'client.invert': lambda: r16.invert(5),
+        'client.turn_off_all': r16.turn_off_all,
+        'client.state': lambda: r16.state(5),
+        'client.state_all': r16.state_all,
+        'client.read_16_by_state': state_16,
+        'client.invert_16_serial': lambda: [r16.invert(rel) for rel in range(1, 17)],
+        'client.invert_16_pipeline': lambda: r16.pipeline([(rel, 3) for rel in range(1, 17)]),
+    }
+
+
+def run(iterations: int, latency: float, only: str = None) -> dict:
+    """
+    Run all benchmarks
+
+    :param iterations: int
+        Number of measured calls per case
+    :param latency: float
+        Simulated device latency in seconds
+    :param only: str
+        Substring to filter cases by name
+    :return: dict
+    """
+
+    results = {}
+
+    with UsrR16Simulator(latency=latency) as sim:
+        r16 = UsrR16(*sim.address)
+        # in-memory board: client overhead without network cost
+        loopback = UsrR16(transport=LoopbackTransport())
+        cases = {**codec_cases(), **client_cases(r16)}
+        cases.update({name.replace('client.', 'loopback.'): fn for name, fn in client_cases(loopback).items()})
+
+        for name, fn in cases.items():
+            if only and only not in name:
+                continue
+
+            # codec operations are ~1000x cheaper, give them more iterations
+            n = iterations * 100 if name.startswith(('encode.', 'decode.')) else iterations
+            results[name] = measure(fn, n)
+            print(f"{name:<28} p50 {results[name]['p50_us']:>10.1f}us  "
+                  f"p99 {results[name]['p99_us']:>10.1f}us  "
+                  f"{results[name]['ops_per_sec']:>12.0f} ops/s", file=sys.stderr)
+
+        r16.close()
+        loopback.close()
+
+    return {
+        'version': usrr16.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'iterations': iterations,
+        'latency': latency,
+        'results': results,
+    }
+
+
+def compare(old_path: str, new_path: str, threshold: float = 0.1) -> int:
+    """
+    Print p50 / ops change between two results files
+
+    :return: int
+        Exit code, 1 if any case got slower than threshold
+    """
+
+    with open(old_path) as f:
+        old = json.load(f)['results']
+    with open(new_path) as f:
+        new = json.load(f)['results']
+
+    code = 0
+    for name in sorted(set(old) & set(new)):
+        change = new[name]['p50_us'] / old[name]['p50_us'] - 1
+        mark = ''
+        if change > threshold:
+            mark = '  << REGRESSION'
+            code = 1
+        print(f"{name:<28} p50 {old[name]['p50_us']:>10.1f}us -> {new[name]['p50_us']:>10.1f}us  "
+              f"({change:+.1%}){mark}")
+
+    return code
+
+
+def main():
+    parser = argparse.ArgumentParser(description='UsrR16 client benchmarks')
+    parser.add_argument('--iterations', type=int, default=1000, help='measured calls per case')
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated device latency, seconds')
+    parser.add_argument('--only', help='run only cases containing this substring')
+    parser.add_argument('--output', default='bench_results.json', help='results file')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two results files')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare))
+
+    report = run(iterations=args.iterations, latency=args.latency, only=args.only)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,48 +1,52 @@
-from time import sleep
 from usrr16 import UsrR16
+from usrr16.timeline import Timeline
 
 
 def street():
+    timeline = Timeline()
     for i in range(1, 8):
-        r16.invert(i)
-        sleep(0.1)
-        r16.invert(i+8)
-        sleep(0.1)
+        timeline.invert(0.2 * (i - 1), i)
+        timeline.invert(0.2 * (i - 1) + 0.1, i+8)
+    return timeline
 
 
 def snake():
+    timeline = Timeline()
     for i in range(1, 16+1):
-        r16.invert(i)
-        sleep(0.1)
+        timeline.invert(0.1 * (i - 1), i)
+    return timeline
 
 
 def double():
+    timeline = Timeline()
     for i in range(1, 16+1):
-        r16.invert(i)
-        sleep(0.1)
-        r16.invert(16-i)
-        sleep(0.1)
+        timeline.invert(0.2 * (i - 1), i)
+        timeline.invert(0.2 * (i - 1) + 0.1, 16-i)
+    return timeline
 
 
 def zigzag():
-    sleep(0.2)
+    timeline = Timeline()
+    t = 0.2
     for i in range(1, 16+1):
         if i > 1:
-            r16.invert(i-1)
-            sleep(0.2)
-            r16.invert(17 - i)
-            sleep(0.2)
+            timeline.invert(t, i-1)
+            timeline.invert(t + 0.2, 17 - i)
+            t += 0.4
 
-        r16.invert(i)
-        sleep(0.2)
-        r16.invert(16-i)
-        sleep(0.2)
+        timeline.invert(t, i)
+        timeline.invert(t + 0.2, 16-i)
+        t += 0.4
+    return timeline
 
 
 r16 = UsrR16(host='192.168.0.23', port=8899, password='admin')
 # r16 = UsrR16(host='192.168.0.27')
 
-street()
+# steps go at planned offsets, network latency doesn't add up
+for step in street().run(r16):
+    print(f"relay {step.relay} at {step.at:.1f}s, late {step.late * 1000:.1f}ms")
+
 print(r16.state(1))
 
 r16.turn_off(1)
@@ -50,4 +54,3 @@ print(r16.state(1))
 print(r16.state(2))
 
 r16.turn_off_all()
-
@@ -35,7 +35,9 @@ import serial
 import string
 import socket
 import datetime
+import threading
 from usrr16 import UsrR16
+from usrr16.discovery import scan
 
 # This must be set to output unicode characters
 locale.setlocale(locale.LC_ALL, '')
@@ -58,6 +60,10 @@ WIDTH = 10
 # and can change your IP address and password.
 # HOST = '192.168.0.7'
 HOST = '192.168.0.27'
+# No board at hand? Run `python -m usrr16.simulator` and use
+# HOST = '127.0.0.1'
+# If the board is not found at HOST (e.g. new DHCP address), this network is scanned
+DISCOVER_NETWORK = '192.168.0.0/24'
 
 # Relays on USR-R16 relay board
 relay = []
@@ -102,6 +108,15 @@ relay.append([COL3, ROW + 12, WIDTH, 'Relay 16'])
 # Set cycle time for CYCLE operation to N seconds
 CYCLE_TIME = 5
 
+# Read the whole board in background every N seconds,
+# screen is redrawn when relays are switched by someone else
+POLL_INTERVAL = 0.5
+
+# Relays state read from the board is reused for N seconds,
+# changes made from this app are applied to it right away.
+# Keep it longer than POLL_INTERVAL, so keypresses never wait for the board
+STATE_CACHE_TTL = 5.0
+
 # ************  END OF USER MODIFIABLE SETTINGS *****************************
 
 VERSION = 'V1.0 - Python 3'
@@ -113,13 +128,18 @@ CURSOR_BLOCK = 2  # Block cursor
 
 NOCHAR = -1
 
+# How often input loop checks for relays state changes, ms
+REDRAW_CHECK = 100
+
 
 class MBRTerm():
 
-    def __init__(self, r16):
+    # `changed` is set by the board watcher when relays get switched
+    def __init__(self, r16, changed=None):
         self.screen = None
         self.status = None
         self.r16 = r16
+        self.changed = changed
 
     def setup_screen(self):
         self.cur = curses.initscr()  # Initialize curses.
@@ -273,7 +293,8 @@ class MBRTerm():
                 return ('')
 
     def up_down_select(self):
-        self.screen.nodelay(0)
+        # Wait for a key, but wake up now and then to redraw changed relays
+        self.screen.timeout(REDRAW_CHECK)
         self.screen.keypad(1)
         curses.curs_set(0)
 
@@ -287,36 +308,46 @@ class MBRTerm():
             curses.flushinp()
             c = self.screen.getch()
 
+            if c == NOCHAR:
+                if self.changed and self.changed.is_set():
+                    self.changed.clear()
+                    self.draw_relays(idx)
+                continue
+
             if c == curses.KEY_DOWN:
                 if idx + 1 < len(relay):
-                    state = self.get_relay_state(idx)
+                    mask = self.r16.state_all()
+                    state = self.get_relay_state(idx, mask)
                     self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], state, False, str(idx))
                     idx += 1
-                    state = self.get_relay_state(idx)
+                    state = self.get_relay_state(idx, mask)
                     self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], state, True, str(idx))
                     self.screen.refresh()
             elif c == curses.KEY_UP:
                 if idx - 1 >= 1:
-                    state = self.get_relay_state(idx)
+                    mask = self.r16.state_all()
+                    state = self.get_relay_state(idx, mask)
                     self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], state, False, str(idx))
                     idx -= 1
-                    state = self.get_relay_state(idx)
+                    state = self.get_relay_state(idx, mask)
                     self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], state, True, str(idx))
                     self.screen.refresh()
             elif c == curses.KEY_RIGHT:
                 if idx + 4 < len(relay):
-                    state = self.get_relay_state(idx)
+                    mask = self.r16.state_all()
+                    state = self.get_relay_state(idx, mask)
                     self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], state, False, str(idx))
                     idx += 4
-                    state = self.get_relay_state(idx)
+                    state = self.get_relay_state(idx, mask)
                     self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], state, True, str(idx))
                     self.screen.refresh()
             elif c == curses.KEY_LEFT:
                 if idx - 4 < len(relay) and idx - 4 > 0:
-                    state = self.get_relay_state(idx)
+                    mask = self.r16.state_all()
+                    state = self.get_relay_state(idx, mask)
                     self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], state, False, str(idx))
                     idx -= 4
-                    state = self.get_relay_state(idx)
+                    state = self.get_relay_state(idx, mask)
                     self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], state, True, str(idx))
                     self.screen.refresh()
 
@@ -346,8 +377,12 @@ class MBRTerm():
                 curses.curs_set(1)
                 sys.exit()
 
-    def get_relay_state(self, relay):
-        if self.r16.state(relay):
+    # Pass mask from self.r16.state_all() to avoid a request per relay
+    def get_relay_state(self, relay, mask=None):
+        if mask is None:
+            mask = self.r16.state_all()
+
+        if mask[relay]:
             return ('ON ')
         else:
             return ('OFF')
@@ -355,19 +390,15 @@ class MBRTerm():
     # Get here from popup_run_stop()
     # state = 'ON ', 'OFF' or 'CYCLE'
     def set_relay_state(self, idx, state):
+        # Relay is switched back by a background timer, the app is not blocked
         if state == 'CYCLE':
-            state = self.get_relay_state(idx)
-            if state == 'OFF':
+            if self.get_relay_state(idx) == 'OFF':
+                self.r16.pulse(idx, CYCLE_TIME, on=True)
                 self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], 'ON ', True, str(idx))
-                self.r16.turn_on(idx)
-                time.sleep(CYCLE_TIME)
-                self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], 'OFF', True, str(idx))
             else:
+                self.r16.pulse(idx, CYCLE_TIME, on=False)
                 self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], 'OFF', True, str(idx))
-                self.r16.turn_off(idx)
-                time.sleep(CYCLE_TIME)
-                self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], 'ON ', True, str(idx))
-        if state == 'OFF':
+        elif state == 'OFF':
             self.r16.turn_off(idx)
             self.draw_box(relay[idx][0], relay[idx][1], relay[idx][2], relay[idx][3], state, True, str(idx))
         else:
@@ -392,20 +423,20 @@ class MBRTerm():
         self.status.addstr('X ')
         self.status.refresh()
 
-        state = 'OFF'
         # column 1
         # self.draw_box(10,4,15,'Camera1      ',status,True)
-        for i in range(1, len(relay)):
-            if i == 1:
-                selected = True
-            else:
-                selected = False
-            state = self.get_relay_state(i)
-            self.draw_box(relay[i][0], relay[i][1], relay[i][2], relay[i][3], state, selected, i)
+        self.draw_relays(1)
 
         # now process UP / DOWN arrows keys
         self.up_down_select()
 
+    # Draw all relays from one state snapshot, `selected` is highlighted
+    def draw_relays(self, selected):
+        mask = self.r16.state_all()
+        for i in range(1, len(relay)):
+            state = self.get_relay_state(i, mask)
+            self.draw_box(relay[i][0], relay[i][1], relay[i][2], relay[i][3], state, i == selected, i)
+
     def draw_box(self, x, y, width, label, state, selected, relay):
         # draw box
         self.screen.addch(y, x, curses.ACS_ULCORNER)
@@ -481,20 +512,18 @@ class MBRTerm():
         date_string = ''
         today = datetime.datetime.today()
 
-        # Loop time makes sure process doesn't run wild
-        loop_time = 0.0
-
         self.show_status_line()
         self.show_intro()
         curses.curs_set(CURSOR_INVISIBLE)
 
+        # Block on input instead of spinning
+        scn.nodelay(0)
+
         while True:
             c = NOCHAR
 
             c = scn.getch()
             if c != NOCHAR:
-                loop_time = 0.0
-
                 if first_char:
                     term.screen.erase()
                     first_char = False
@@ -505,19 +534,23 @@ class MBRTerm():
                 else:
                     self.process_key(c)
 
-            if loop_time <= 0.1:
-                loop_time += 0.000001
-            else:
-                time.sleep(loop_time)
-
 
 if __name__ == "__main__":
     # Get an instance of USR-R16 relay control
     try:
-        r16 = UsrR16(host=HOST, port=8899, password='admin')
+        r16 = UsrR16(host=HOST, port=8899, password='admin', cache_ttl=STATE_CACHE_TTL, connect_timeout=2)
     except:
-        print("Cannot reach the USR-R16 relay board, exiting...")
-        sys.exit()
+        found = [board.host for board in scan(DISCOVER_NETWORK) if board.authorized]
+        if not found:
+            print("Cannot reach the USR-R16 relay board, exiting...")
+            sys.exit()
+
+        print(f"Board not found at {HOST}, using {found[0]}")
+        r16 = UsrR16(host=found[0], port=8899, password='admin', cache_ttl=STATE_CACHE_TTL)
+
+    # One background reader of the whole board at a fixed rate
+    changed = threading.Event()
+    r16.watch(min_interval=POLL_INTERVAL, max_interval=POLL_INTERVAL).subscribe(lambda changes, mask: changed.set())
 
-    term = MBRTerm(r16)
+    term = MBRTerm(r16, changed)
     curses.wrapper(term.main, term)
@@ -20,6 +20,13 @@ setup(
     download_url=f"https://github.com/V1A0/usr-r16/archive/refs/tags/v{usrr16.__version__}.tar.gz",
     keywords=['relay', 'usr-r16', 'usr-r16-t', 'usrr16', 'usrr16t', 'lonhand', 'api'],
     install_requires=[],
+    extras_require={
+        'numpy': ['numpy'],
+        'serial': ['pyserial'],
+    },
+    entry_points={
+        'console_scripts': ['usrr16=usrr16.cli:main'],
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Intended Audience :: Developers',
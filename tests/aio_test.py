@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+from usrr16.aio import AsyncUsrR16
+from usrr16.simulator import UsrR16Simulator
+
+
+class TestAsyncUsrR16(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator().start()
+
+    def tearDown(self) -> None:
+        self.simulator.stop()
+
+    async def test_commands(self):
+        async with AsyncUsrR16(*self.simulator.address) as r16:
+            await r16.turn_on(1)
+            await r16.turn_on(16)
+            self.assertEqual(await r16.state_all(), 0x8001)
+
+            await r16.invert(1)
+            self.assertFalse(await r16.state(1))
+
+            await r16.turn_off(16)
+            self.assertFalse(await r16.state(16))
+
+            await r16.turn_on(2)
+            await r16.turn_off_all()
+            self.assertEqual(await r16.state_all(), 0x0000)
+
+    async def test_concurrent_commands(self):
+        async with AsyncUsrR16(*self.simulator.address) as r16:
+            await asyncio.gather(*(r16.turn_on(rel) for rel in range(1, 17)))
+            states = await asyncio.gather(*(r16.state(rel) for rel in range(1, 17)))
+
+        self.assertEqual(states, [True] * 16)
+
+    async def test_wrong_password(self):
+        with self.assertRaises(ConnectionError):
+            await AsyncUsrR16(*self.simulator.address, password='nimda').connect()
+
+    async def test_timeout(self):
+        r16 = await AsyncUsrR16(*self.simulator.address).connect()
+        self.simulator.latency = 0.2
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await r16.state_all(timeout=0.05)
+
+        with self.assertRaises(ConnectionError):
+            await r16.state_all()
+
+    async def test_timeout_while_waiting(self):
+        r16 = await AsyncUsrR16(*self.simulator.address).connect()
+        self.simulator.latency = 0.2
+
+        results = await asyncio.gather(*(r16.state_all(timeout=0.05) for _ in range(3)), return_exceptions=True)
+
+        self.assertIsInstance(results[0], asyncio.TimeoutError)
+        for result in results[1:]:
+            self.assertIsInstance(result, ConnectionError)
+
+    async def test_cancel(self):
+        r16 = await AsyncUsrR16(*self.simulator.address).connect()
+        self.simulator.latency = 0.1
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(r16.turn_on(1), 0.02)
+
+        # the late answer on turn_on is not taken as the state
+        with self.assertRaises(ConnectionError):
+            await r16.state_all()
+
+        self.simulator.latency = 0.0
+        await r16.connect()
+        await asyncio.sleep(0.15)
+        self.assertEqual(await r16.state_all(), 0x0001)
+        await r16.close()
@@ -0,0 +1,60 @@
+import contextlib
+import io
+import json
+import unittest
+from usrr16 import UsrR16
+from usrr16.cli import batch, main
+from usrr16.simulator import UsrR16Simulator
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator().start()
+        self.host, self.port = self.simulator.address
+
+    def tearDown(self) -> None:
+        self.simulator.stop()
+
+    def run_cli(self, *args) -> tuple:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            code = main(['--host', self.host, '--port', str(self.port)] + list(args))
+        return code, output.getvalue()
+
+    def test_commands(self):
+        self.assertEqual(self.run_cli('on', '1', '3'), (0, 'ok\n'))
+        self.assertEqual(self.simulator.mask, 0b101)
+
+        self.assertEqual(self.run_cli('state', '1', '2'), (0, 'on off\n'))
+        self.assertEqual(self.run_cli('snapshot'), (0, '1010000000000000\n'))
+
+        code, output = self.run_cli('--json', 'snapshot')
+        self.assertEqual(json.loads(output), {'mask': 5, 'on': [1, 3]})
+
+        self.assertEqual(self.run_cli('invert', '16'), (0, 'ok\n'))
+        self.assertEqual(self.run_cli('off', '1'), (0, 'ok\n'))
+        self.assertEqual(self.simulator.mask, 0x8004)
+
+        self.assertEqual(self.run_cli('all-off'), (0, 'ok\n'))
+        self.assertEqual(self.simulator.mask, 0)
+
+    def test_usage_errors(self):
+        self.assertEqual(self.run_cli('on', '17')[0], 2)
+        self.assertEqual(self.run_cli('state')[0], 2)
+
+    def test_batch(self):
+        r16 = UsrR16(self.host, self.port)
+        output = io.StringIO()
+        lines = ['# comment\n', 'on 2\n', '\n', 'state 2\n', 'bogus\n', 'all-off\n', 'snapshot\n']
+
+        self.assertEqual(batch(r16, lines, output), 1)
+        self.assertEqual(output.getvalue().splitlines(), [
+            'ok', 'on', "error: Unknown command 'bogus', expected one of: on, off, invert, all-off, state, snapshot",
+            'ok', '0000000000000000',
+        ])
+        r16.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
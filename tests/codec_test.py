@@ -0,0 +1,72 @@
+import unittest
+from usrr16.codec import FrameDecoder, FrameError, FRAMES, encode
+
+STATE = b'\xaa\x55\x00\x04\x00\x8a\x08\x01\x97'
+ON_1 = b'\xaa\x55\x00\x03\x00\x82\x01\x86'
+
+
+class TestEncode(unittest.TestCase):
+
+    def test_prebuilt(self):
+        self.assertEqual(encode(5, 2), b'\x55\xaa\x00\x03\x00\x02\x05\x03')
+        self.assertIs(encode(5, 2), FRAMES[(2, 5)])
+
+    def test_unknown_command(self):
+        self.assertEqual(encode(1, 0x0b), b'\x55\xaa\x00\x03\x00\x0b\x01\x03')
+
+    def test_out_of_range(self):
+        for relay in (-1, 17):
+            with self.assertRaises(ValueError):
+                encode(relay, 2)
+
+
+class TestFrameDecoder(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.decoder = FrameDecoder(size=16)
+
+    def frames(self) -> list:
+        frames = []
+        while (frame := self.decoder.next_frame()) is not None:
+            frames.append(frame)
+        return frames
+
+    def test_split(self):
+        for i in range(len(STATE) - 1):
+            self.decoder.feed(STATE[i:i + 1])
+            self.assertIsNone(self.decoder.next_frame())
+
+        self.decoder.feed(STATE[-1:])
+        self.assertEqual(self.decoder.next_frame(), STATE)
+        self.assertEqual(len(self.decoder), 0)
+
+    def test_merged(self):
+        self.decoder.feed(ON_1 + STATE + ON_1[:3])
+        self.assertEqual(self.frames(), [ON_1, STATE])
+
+        self.decoder.feed(ON_1[3:])
+        self.assertEqual(self.frames(), [ON_1])
+
+    def test_garbage(self):
+        self.decoder.feed(b'\x00\x13\xaa' + STATE + b'\xaa\x55\xff\xff' + ON_1)
+        self.assertEqual(self.frames(), [STATE, ON_1])
+        self.assertEqual(self.decoder.skipped, 7)
+
+    def test_wrong_checksum(self):
+        self.decoder.feed(STATE[:-1] + b'\x00' + ON_1)
+
+        with self.assertRaises(FrameError):
+            self.decoder.next_frame()
+
+        self.assertEqual(self.decoder.next_frame(), ON_1)
+        self.assertEqual(self.decoder.broken, 1)
+
+    def test_recv_into(self):
+        data = (STATE + ON_1) * 20
+
+        for i in range(0, len(data), 7):
+            chunk = data[i:i + 7]
+            self.decoder.writable(len(chunk))[:len(chunk)] = chunk
+            self.decoder.commit(len(chunk))
+
+        self.assertEqual(self.frames(), [STATE, ON_1] * 20)
@@ -0,0 +1,85 @@
+import asyncio
+import contextlib
+import io
+import json
+import socket
+import socketserver
+import threading
+import time
+import unittest
+from usrr16.cli import main
+from usrr16.discovery import Board, expand, discover, scan
+from usrr16.simulator import UsrR16Simulator
+
+
+class _Garbage(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.request.recv(64)
+        self.request.sendall(b'HTTP/1.1 400 Bad Request\r\n\r\n')
+
+
+class TestExpand(unittest.TestCase):
+
+    def test_expand(self):
+        self.assertEqual(expand('10.0.0.0/30'), ['10.0.0.1', '10.0.0.2'])
+        self.assertEqual(expand(['10.0.0.7', 'board.local', '10.0.1.5/32']), ['10.0.0.7', 'board.local', '10.0.1.5'])
+        self.assertEqual(len(expand('192.168.0.0/24')), 254)
+
+
+class TestDiscovery(unittest.TestCase):
+    """
+    Stand-in listeners on loopback addresses 127.0.0.2-5, one port:
+    a board, a board with other password, a non-board server, a silent listener
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.board = UsrR16Simulator(host='127.0.0.2').start()
+        cls.board.mask = 0x0003
+        cls.port = cls.board.address[1]
+        cls.locked = UsrR16Simulator(host='127.0.0.3', port=cls.port, password='secret').start()
+
+        cls.garbage = socketserver.ThreadingTCPServer(('127.0.0.4', cls.port), _Garbage)
+        cls.garbage.daemon_threads = True
+        threading.Thread(target=cls.garbage.serve_forever, args=(0.05,), daemon=True).start()
+
+        cls.silent = socket.create_server(('127.0.0.5', cls.port))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.board.stop()
+        cls.locked.stop()
+        cls.garbage.shutdown()
+        cls.garbage.server_close()
+        cls.silent.close()
+
+    def test_scan(self):
+        start = time.monotonic()
+        boards = scan('127.0.0.0/29', port=self.port, budget=1.0, timeout=0.3)
+
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(boards, [
+            Board('127.0.0.2', self.port, True, 0x0003),
+            Board('127.0.0.3', self.port, False, None),
+        ])
+
+    def test_budget(self):
+        # silent listener would take the whole probe timeout
+        start = time.monotonic()
+        boards = asyncio.run(discover(['127.0.0.5', '127.0.0.2'], port=self.port, budget=0.2, timeout=5))
+
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual([board.host for board in boards], ['127.0.0.2'])
+
+    def test_cli(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = main(['--port', str(self.port), '--budget', '0.5', '--json', 'discover', '127.0.0.2', '127.0.0.4'])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(output.getvalue()),
+                         [{'host': '127.0.0.2', 'port': self.port, 'authorized': True, 'mask': 3}])
+
+
+if __name__ == '__main__':
+    unittest.main()
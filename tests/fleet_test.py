@@ -0,0 +1,62 @@
+import socket
+import time
+import unittest
+from usrr16.fleet import UsrR16Fleet
+from usrr16.simulator import UsrR16Simulator
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestUsrR16Fleet(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.simulators = [UsrR16Simulator().start() for _ in range(3)]
+        self.hosts = [f"127.0.0.1:{sim.address[1]}" for sim in self.simulators]
+
+    def tearDown(self) -> None:
+        for sim in self.simulators:
+            sim.stop()
+
+    async def test_commands(self):
+        async with UsrR16Fleet(self.hosts, timeout=1) as fleet:
+            result = await fleet.turn_on([(self.hosts[0], 1), (self.hosts[0], 2), (self.hosts[2], 16)])
+            self.assertEqual(result.errors, {})
+            self.assertEqual([sim.mask for sim in self.simulators], [0x0003, 0x0000, 0x8000])
+
+            states = await fleet.state([(self.hosts[0], 2), (self.hosts[1], 2)])
+            self.assertEqual(states, {(self.hosts[0], 2): True, (self.hosts[1], 2): False})
+
+            await fleet.invert([(self.hosts[1], 3)])
+            masks = await fleet.state_all()
+            self.assertEqual(masks, dict(zip(self.hosts, [0x0003, 0x0004, 0x8000])))
+
+            await fleet.turn_off([(self.hosts[0], 1)])
+            self.assertEqual(self.simulators[0].mask, 0x0002)
+
+            result = await fleet.turn_off_all()
+            self.assertEqual(len(result.ok), 3)
+            self.assertEqual([sim.mask for sim in self.simulators], [0, 0, 0])
+
+    async def test_dead_and_slow_boards(self):
+        dead = f"127.0.0.1:{free_port()}"
+        self.simulators[1].latency = 1
+
+        fleet = UsrR16Fleet(self.hosts + [dead], timeout=0.2, concurrency=2)
+        result = await fleet.connect()
+        self.assertEqual(set(result.errors), {dead, self.hosts[1]})
+
+        start = time.monotonic()
+        result = await fleet.turn_off_all()
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(set(result.ok), {self.hosts[0], self.hosts[2]})
+        self.assertIsInstance(result[dead], ConnectionError)
+
+        result = await fleet.turn_on([(dead, 1), (self.hosts[0], 1)])
+        self.assertIsInstance(result[(dead, 1)], ConnectionError)
+        self.assertIsNone(result[(self.hosts[0], 1)])
+
+        await fleet.close()
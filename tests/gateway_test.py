@@ -0,0 +1,104 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from usrr16 import UsrR16
+from usrr16.cli import main
+from usrr16.gateway import Gateway
+from usrr16.simulator import UsrR16Simulator
+
+
+class TestGateway(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator(latency=0.01).start()
+        self.gateway = Gateway(UsrR16(*self.simulator.address))
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'usrr16.sock')
+
+    def tearDown(self) -> None:
+        self.gateway.close()
+        self.simulator.stop()
+        self.directory.cleanup()
+
+    def test_commands(self):
+        self.assertEqual(self.gateway.pipeline([(1, 2), (2, 2)]), [True, True])
+        self.assertEqual(self.gateway.state_all(), 0b11)
+        self.assertEqual(self.simulator.mask, 0b11)
+        self.assertTrue(self.gateway.state(2))
+
+    def test_coalescing(self):
+        requests = self.simulator.board.requests
+        barrier = threading.Barrier(8)
+        results = []
+
+        def client(relay):
+            barrier.wait()
+            results.append(self.gateway.pipeline([(relay, 2)]))
+            results.append(self.gateway.state_all(max_age=0))
+
+        threads = [threading.Thread(target=client, args=(relay,)) for relay in range(1, 9)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.simulator.mask, 0xFF)
+        self.assertIn(0xFF, results)
+        # state reads share state requests sent after queued commands
+        self.assertLess(self.simulator.board.requests - requests, 8 + 8)
+
+    def test_fresh_view(self):
+        self.gateway.state_all()
+        requests = self.simulator.board.requests
+        self.gateway.state_all(max_age=10)
+        self.assertEqual(self.simulator.board.requests, requests)
+
+    def test_unix(self):
+        self.gateway.serve_unix(self.path)
+
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(self.path)
+            stream = sock.makefile('rw')
+            stream.write('on 3\nstate 3\nsnapshot\n')
+            stream.flush()
+            self.assertEqual([stream.readline() for _ in range(3)], ['ok\n', 'on\n', '0010000000000000\n'])
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(['--gateway', self.path, '--json', 'snapshot']), 0)
+            self.assertEqual(main(['--gateway', self.path, 'off', '3']), 0)
+        self.assertEqual(output.getvalue().splitlines(), [json.dumps({'mask': 4, 'on': [3]}), 'ok'])
+        self.assertEqual(self.simulator.mask, 0)
+
+    def test_http(self):
+        server = self.gateway.serve_http('127.0.0.1', 0)
+        url = 'http://%s:%d' % server.server_address[:2]
+
+        def call(path, method='GET'):
+            with urllib.request.urlopen(urllib.request.Request(url + path, method=method)) as response:
+                return json.load(response)
+
+        self.assertEqual(call('/relays/5/on', 'POST'), {'ok': True})
+        self.assertEqual(call('/state'), {'mask': 16, 'on': [5]})
+        self.assertEqual(call('/state/5'), {'relay': 5, 'on': True})
+        self.assertEqual(call('/all-off', 'POST'), {'ok': True})
+        self.assertEqual(self.simulator.mask, 0)
+
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            call('/relays/17/on', 'POST')
+        self.assertEqual(error.exception.code, 400)
+
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            call('/nothing')
+        self.assertEqual(error.exception.code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
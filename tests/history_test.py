@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from usrr16 import UsrR16, RelayChange
+from usrr16.history import History
+from usrr16.simulator import UsrR16Simulator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.history = History()
+        for at, mask in ((10.0, 0x0000), (20.0, 0x0001), (25.0, 0x0001), (30.0, 0x8001), (40.0, 0x8000)):
+            self.history.record(mask, at=at)
+
+    def test_record(self):
+        self.assertEqual(len(self.history), 4)
+        self.assertEqual(list(self.history.times), [10.0, 20.0, 30.0, 40.0])
+
+        # clock stepped back
+        self.history.record(0x0002, at=35.0)
+        self.assertEqual(self.history.times[-1], 40.0)
+
+    def test_state_at(self):
+        self.assertIsNone(self.history.state_at(5.0))
+        self.assertEqual(self.history.state_at(10.0), 0x0000)
+        self.assertEqual(self.history.state_at(29.9), 0x0001)
+        self.assertEqual(self.history.state_at(30.0), 0x8001)
+        self.assertEqual(self.history.state_at(1e12), 0x8000)
+
+    def test_changes(self):
+        self.assertEqual(self.history.changes(), [
+            RelayChange(1, False, True, 20.0),
+            RelayChange(16, False, True, 30.0),
+            RelayChange(1, True, False, 40.0),
+        ])
+        self.assertEqual(self.history.changes(20.0, 40.0), [
+            RelayChange(1, False, True, 20.0),
+            RelayChange(16, False, True, 30.0),
+        ])
+        self.assertEqual(self.history.changes(25.0, relay=1), [RelayChange(1, True, False, 40.0)])
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'board.r16h')
+
+            with History(path) as history:
+                history.record(0x0001, at=1.0)
+                history.record(0x0003, at=2.0)
+            self.assertEqual(os.path.getsize(path), 20)
+
+            # cut by a crash
+            with open(path, 'ab') as f:
+                f.write(b'\x00\x01\x02')
+
+            with History(path) as history:
+                self.assertEqual(list(history.masks), [0x0001, 0x0003])
+                history.record(0x0000, at=3.0)
+
+            with History(path) as history:
+                self.assertEqual(list(history.times), [1.0, 2.0, 3.0])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        times, masks = self.history.to_numpy()
+        self.assertEqual(times.tolist(), [10.0, 20.0, 30.0, 40.0])
+        self.assertEqual(masks.tolist(), [0x0000, 0x0001, 0x8001, 0x8000])
+
+        _, relays = self.history.to_numpy(relays=True)
+        self.assertEqual(relays.shape, (4, 16))
+        self.assertEqual(relays[2, 0], True)
+        self.assertEqual(relays[2, 15], True)
+
+    def test_client(self):
+        with UsrR16Simulator() as simulator:
+            with UsrR16(*simulator.address, history=self.history) as r16:
+                r16.state_all()
+                r16.turn_on(2)
+                r16.state_all()
+                r16.set_mask(0x0000)
+
+        self.assertEqual(list(self.history.masks)[-3:], [0x0000, 0x0002, 0x0000])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from usrr16 import UsrR16
+from usrr16.metrics import Histogram, Hook, Metrics
+from usrr16.simulator import UsrR16Simulator
+
+
+class RecordingHook(Hook):
+
+    def __init__(self):
+        self.sent = []
+        self.received = []
+
+    def on_send(self, data):
+        self.sent.append(data)
+
+    def on_recv(self, data):
+        self.received.append(data)
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_buckets(self):
+        histogram = Histogram((0.001, 0.01, 0.1))
+        for value in (0.0005, 0.001, 0.005, 0.05, 1.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count, 5)
+        self.assertAlmostEqual(histogram.sum, 1.0565)
+        self.assertEqual(histogram.cumulative(), [(0.001, 2), (0.01, 3), (0.1, 4), (float('inf'), 5)])
+        self.assertEqual(histogram.quantile(0.5), 0.01)
+        self.assertEqual(histogram.quantile(0.99), float('inf'))
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_prometheus(self):
+        metrics = Metrics(buckets=(0.01, 0.1))
+        metrics.observe('b:1', 'state', 0.005)
+        metrics.inc('retries', 'b:1', 2)
+        text = metrics.prometheus()
+
+        self.assertIn('# TYPE usrr16_request_duration_seconds histogram', text)
+        self.assertIn('usrr16_request_duration_seconds_bucket{board="b:1",command="state",le="0.01"} 1', text)
+        self.assertIn('usrr16_request_duration_seconds_bucket{board="b:1",command="state",le="+Inf"} 1', text)
+        self.assertIn('usrr16_request_duration_seconds_count{board="b:1",command="state"} 1', text)
+        self.assertIn('usrr16_retries_total{board="b:1"} 2', text)
+
+    def test_client(self):
+        with UsrR16Simulator() as simulator:
+            metrics = Metrics()
+            hook = RecordingHook()
+            r16 = UsrR16(*simulator.address, metrics=metrics, hooks=[hook])
+            board = r16.board
+
+            r16.turn_on(1)
+            r16.state_all()
+            r16.pipeline([(2, 2), (3, 2)])
+
+            simulator.drop_connections()
+            with self.assertRaises(OSError):
+                r16.state_all()
+            r16.state_all()
+            r16.close()
+
+        snapshot = metrics.snapshot()
+        latency = snapshot['latency'][board]
+        self.assertEqual(latency['on']['count'], 1)
+        self.assertEqual(latency['state']['count'], 2)
+        self.assertEqual(latency['batch']['count'], 1)
+
+        counters = snapshot['counters']
+        self.assertEqual(counters['frames_sent'][board], 6)
+        self.assertEqual(counters['frames_received'][board], 5)
+        self.assertEqual(counters['errors'][board], 1)
+        self.assertEqual(counters['reconnects'][board], 1)
+        self.assertEqual(counters['bytes_sent'][board], sum(map(len, hook.sent)))
+        self.assertEqual(counters['bytes_received'][board], sum(map(len, hook.received)))
+
+        # password line and 'OK' go through hooks too
+        self.assertEqual(hook.sent[0], b'admin\r\n')
+        self.assertEqual(hook.received[0], b'OK')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+from usrr16 import UsrR16
+from usrr16.metrics import Hook
+from usrr16.pacing import Pacer
+from usrr16.simulator import UsrR16Simulator
+
+
+class TestPacer(unittest.TestCase):
+
+    def test_aimd(self):
+        pacer = Pacer(rate=10, min_rate=4, max_rate=20, increase=2, decrease=0.5)
+
+        pacer.success(0.001, frames=3)
+        self.assertEqual(pacer.rate, 16)
+        pacer.success(0.001, frames=3)
+        self.assertEqual(pacer.rate, 20)
+
+        pacer.failure()
+        self.assertEqual(pacer.rate, 10)
+        self.assertEqual(pacer.gap, 0.1)
+        pacer.failure()
+        pacer.failure()
+        self.assertEqual(pacer.rate, 4)
+        self.assertEqual(pacer.failures, 3)
+
+    def test_congestion(self):
+        pacer = Pacer(rate=100, increase=1, latency_factor=4, latency_slack=0.005)
+
+        pacer.success(0.010)
+        self.assertEqual(pacer.rate, 101)
+        pacer.success(0.040)    # under 0.010 * 4 + 0.005
+        self.assertEqual(pacer.rate, 102)
+        pacer.success(0.100)
+        self.assertEqual(pacer.rate, 51)
+        self.assertEqual(pacer.congestions, 1)
+
+
+class TestPacing(unittest.TestCase):
+
+    def run_commands(self, pacing) -> tuple:
+        with UsrR16Simulator(min_gap=0.002) as simulator:
+            with UsrR16(*simulator.address, pacing=pacing) as r16:
+                results = [r16.pipeline([(relay % 16 + 1, 3)])[0] for relay in range(300)]
+            return results.count(False), simulator.garbled
+
+    def test_converges(self):
+        pacer = Pacer(rate=50, max_rate=5000, increase=20)
+        failed, garbled = self.run_commands(pacer)
+
+        self.assertEqual(failed, garbled)
+        self.assertLess(failed, 300 * 0.15)
+        # around 500 writes per second the board handles
+        self.assertGreater(pacer.rate, 100)
+        self.assertLess(pacer.rate, 1000)
+
+    def test_without_pacing(self):
+        failed, garbled = self.run_commands(None)
+        self.assertGreater(failed, 300 * 0.5)
+
+    def test_shared(self):
+        # 50ms slots, the board garbles writes closer than 20ms
+        pacer = Pacer(rate=20, max_rate=20, increase=0)
+
+        with UsrR16Simulator(min_gap=0.02) as simulator:
+            clients = [UsrR16(*simulator.address, pacing=pacer) for _ in range(4)]
+            garbled = simulator.garbled
+            time.sleep(0.05)    # login lines are not paced
+            barrier = threading.Barrier(len(clients))
+
+            def run(r16):
+                barrier.wait()
+                for relay in range(1, 11):
+                    r16.pipeline([(relay, 3)])
+
+            threads = [threading.Thread(target=run, args=(r16,)) for r16 in clients]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            for r16 in clients:
+                r16.close()
+
+            self.assertEqual(simulator.garbled - garbled, 0)
+
+    def test_hooks_after_pause(self):
+        pacer = Pacer(rate=10, max_rate=10)
+        sent = []
+        hook = Hook()
+        hook.on_send = lambda data: sent.append(time.monotonic())
+
+        with UsrR16Simulator() as simulator:
+            with UsrR16(*simulator.address, pacing=pacer, hooks=[hook]) as r16:
+                r16.turn_on(1)
+                r16.turn_on(2)
+
+        # password line, then two commands 0.1 second apart
+        self.assertGreaterEqual(sent[2] - sent[1], 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
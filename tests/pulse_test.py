@@ -0,0 +1,124 @@
+import threading
+import time
+import unittest
+from usrr16 import UsrR16
+from usrr16.simulator import UsrR16Simulator
+from usrr16.timers import Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+
+    def test_order_and_cancel(self):
+        scheduler = Scheduler()
+        calls = []
+        done = threading.Event()
+
+        scheduler.call_later(0.03, lambda: calls.append(3))
+        scheduler.call_later(0.01, lambda: calls.append(1))
+        scheduler.call_later(0.02, lambda: calls.append(2)).cancel()
+        scheduler.call_later(0.04, done.set)
+
+        self.assertTrue(done.wait(1))
+        self.assertEqual(calls, [1, 3])
+
+
+class TestPulse(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator().start()
+        self.relay_r16 = UsrR16(*self.simulator.address)
+
+    def tearDown(self) -> None:
+        self.relay_r16.close()
+        self.simulator.stop()
+
+    def test_pulse(self):
+        start = time.monotonic()
+        pulse = self.relay_r16.pulse(1, 0.05)
+
+        self.assertLess(time.monotonic() - start, 0.03)
+        self.assertEqual(self.simulator.mask, 0x0001)
+        self.assertTrue(pulse.wait(1))
+        self.assertEqual(self.simulator.mask, 0x0000)
+        self.assertIsNone(pulse.error)
+
+    def test_pulse_off(self):
+        self.simulator.mask = 0x0002
+        self.relay_r16.pulse(2, 0.02, on=False).wait(1)
+        self.assertEqual(self.simulator.mask, 0x0002)
+
+    def test_overlapping(self):
+        pulses = [self.relay_r16.pulse(rel, 0.05) for rel in range(1, 17)]
+        self.assertEqual(self.simulator.mask, 0xFFFF)
+
+        for pulse in pulses:
+            self.assertTrue(pulse.wait(1))
+        self.assertEqual(self.simulator.mask, 0x0000)
+
+    def test_cancel(self):
+        pulse = self.relay_r16.pulse(3, 0.02)
+        self.assertTrue(pulse.cancel())
+        time.sleep(0.05)
+        self.assertEqual(self.simulator.mask, 0x0004)
+        self.assertFalse(pulse.active)
+
+        pulse = self.relay_r16.pulse(4, 10)
+        self.assertTrue(pulse.cancel(revert=True))
+        self.assertEqual(self.simulator.mask, 0x0004)
+        self.assertFalse(pulse.cancel())
+
+    def test_extend(self):
+        pulse = self.relay_r16.pulse(5, 0.03)
+        self.assertTrue(pulse.extend(0.05))
+
+        time.sleep(0.05)
+        self.assertEqual(self.simulator.mask, 0x0010)
+        self.assertTrue(pulse.wait(1))
+        self.assertEqual(self.simulator.mask, 0x0000)
+
+    def test_extend_fired_timer(self):
+        scheduler = Scheduler(workers=1)
+        self.relay_r16.scheduler = scheduler
+        release = threading.Event()
+        self.addCleanup(release.set)
+        scheduler.call_later(0, release.wait)   # the only worker is busy
+
+        pulse = self.relay_r16.pulse(5, 0.02)
+        time.sleep(0.05)                        # the timer has fired, its callback waits
+        self.assertTrue(pulse.extend(10.0))
+        release.set()
+
+        time.sleep(0.05)
+        self.assertTrue(pulse.active)
+        self.assertEqual(self.simulator.mask, 0x0010)
+        pulse.cancel()
+
+    def test_replace(self):
+        first = self.relay_r16.pulse(6, 0.02)
+        second = self.relay_r16.pulse(6, 0.1)
+
+        self.assertFalse(first.active)
+        time.sleep(0.05)
+        self.assertEqual(self.simulator.mask, 0x0020)
+        self.assertTrue(second.wait(1))
+
+    def test_replace_failed(self):
+        first = self.relay_r16.pulse(7, 0.1)
+        self.simulator.drop_connections()
+
+        with self.assertRaises(OSError):
+            self.relay_r16.pulse(7, 10)
+
+        # the first pulse still switches the relay back
+        self.assertTrue(first.active)
+        self.assertTrue(first.wait(1))
+        self.assertEqual(self.simulator.mask, 0x0000)
+
+    def test_revert_failed(self):
+        pulse = self.relay_r16.pulse(8, 0.1)
+        self.relay_r16.close()
+
+        with self.assertLogs('usrr16.pulse', 'WARNING'):
+            self.assertTrue(pulse.wait(1))
+        self.assertIsInstance(pulse.error, ConnectionError)
+        self.assertEqual(self.simulator.mask, 0x0080)
@@ -0,0 +1,111 @@
+import time
+import unittest
+from usrr16 import UsrR16
+from usrr16.reconciler import Reconciler
+from usrr16.simulator import UsrR16Simulator
+from usrr16.timers import Scheduler
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class TestReconciler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator().start()
+        self.relay_r16 = UsrR16(*self.simulator.address)
+        self.reconciler = Reconciler(self.relay_r16, interval=60, debounce=0.05)
+
+    def tearDown(self) -> None:
+        self.reconciler.stop()
+        self.relay_r16.close()
+        self.simulator.stop()
+
+    def test_reconcile(self):
+        self.assertEqual(self.reconciler.reconcile(), [])
+
+        self.reconciler.set_mask(0x00FF)
+        self.assertEqual(self.reconciler.reconcile(), [(relay, 2) for relay in range(1, 9)])
+        self.assertEqual(self.simulator.mask, 0x00FF)
+
+        # drift, e.g. from the web UI
+        self.simulator.mask = 0x00FE
+        self.assertEqual(self.reconciler.reconcile(), [(1, 2)])
+        self.assertEqual(self.reconciler.mask, 0x00FF)
+        self.assertEqual(self.reconciler.corrections, 2)
+
+    def test_unmanaged(self):
+        self.simulator.mask = 0x8000
+        self.reconciler.set(3, True)
+        self.reconciler.set(4, False)
+
+        self.assertEqual(self.reconciler.reconcile(), [(3, 2)])
+        self.assertEqual(self.simulator.mask, 0x8004)
+
+        self.reconciler.release(3)
+        self.simulator.mask = 0x000C
+        self.assertEqual(self.reconciler.reconcile(), [(4, 1)])
+        self.assertEqual(self.simulator.mask, 0x0004)
+
+        with self.assertRaises(ValueError):
+            self.reconciler.set(17, True)
+
+    def test_set_order(self):
+        seen = []
+
+        class Watched(Reconciler):
+            # what a reconcile running between the updates would read
+            @property
+            def managed(self):
+                return self.__dict__.get('managed', 0)
+
+            @managed.setter
+            def managed(self, value):
+                self.__dict__['managed'] = value
+                seen.append(self.desired & value)
+
+        reconciler = Watched(self.relay_r16)
+        reconciler.set(3, True)
+        self.assertEqual(seen[-1], 0x0004)
+
+    def test_scheduler(self):
+        self.relay_r16.scheduler = Scheduler()
+        self.assertIs(Reconciler(self.relay_r16)._scheduler, self.relay_r16.scheduler)
+
+    def test_debounce(self):
+        self.reconciler.start()
+        self.assertTrue(wait_for(lambda: self.reconciler.mask is not None))
+        requests = self.simulator.board.requests
+
+        for relay in range(1, 17):
+            self.reconciler.set(relay, relay % 2 == 1)
+
+        self.assertTrue(wait_for(lambda: self.simulator.mask == 0x5555))
+        time.sleep(0.1)
+        # one reconcile: state, 8 commands, state
+        self.assertEqual(self.simulator.board.requests - requests, 10)
+        self.assertEqual(self.reconciler.corrections, 1)
+
+    def test_periodic(self):
+        self.reconciler.interval = 0.02
+        self.reconciler.set_mask(0x0001)
+        self.reconciler.start()
+        self.assertTrue(wait_for(lambda: self.simulator.mask == 0x0001))
+
+        self.simulator.mask = 0x0000
+        self.assertTrue(wait_for(lambda: self.simulator.mask == 0x0001))
+
+        self.reconciler.stop()
+        self.simulator.mask = 0x0000
+        time.sleep(0.1)
+        self.assertEqual(self.simulator.mask, 0x0000)
+
+
+if __name__ == '__main__':
+    unittest.main()
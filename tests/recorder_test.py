@@ -0,0 +1,69 @@
+import io
+import time
+import unittest
+from usrr16 import UsrR16
+from usrr16.recorder import Recorder, Record, SENT, RECEIVED, read_log, exchanges, replay
+from usrr16.simulator import UsrR16Simulator
+
+
+class TestRecorder(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator().start()
+
+    def tearDown(self) -> None:
+        self.simulator.stop()
+
+    def record(self) -> io.BytesIO:
+        log = io.BytesIO()
+        with Recorder(log) as recorder:
+            r16 = UsrR16(*self.simulator.address, hooks=[recorder])
+            r16.turn_on(1)
+            time.sleep(0.05)
+            r16.pipeline([(2, 2), (3, 2)])
+            r16.state_all()
+            r16.close()
+
+        log.seek(0)
+        return log
+
+    def test_log(self):
+        records = read_log(self.record())
+
+        self.assertEqual(records[0], Record(records[0].time, SENT, b'admin\r\n'))
+        self.assertEqual(records[1].direction, RECEIVED)
+        self.assertEqual(records[1].data, b'OK')
+        self.assertEqual([record.time for record in records], sorted(record.time for record in records))
+
+        plan = exchanges(records)
+        self.assertEqual(len(plan), 4)
+        self.assertEqual(plan[1][1], UsrR16.req_gen(1, 2))
+        self.assertEqual(plan[2][1], UsrR16.req_gen(2, 2) + UsrR16.req_gen(3, 2))
+        self.assertEqual(len(plan[2][2]), 2 * 8)
+
+    def test_truncated(self):
+        data = self.record().getvalue()
+        self.assertEqual(len(read_log(io.BytesIO(data[:-1]))), len(read_log(io.BytesIO(data))) - 1)
+
+        with self.assertRaises(ValueError):
+            read_log(io.BytesIO(b'garbage'))
+
+    def test_replay(self):
+        records = read_log(self.record())
+        self.simulator.mask = 0
+
+        results = replay(records, *self.simulator.address)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(result.match for result in results))
+        self.assertEqual(self.simulator.mask, 0b111)
+        # original pause between the first command and the batch is kept
+        self.assertGreaterEqual(results[2].at - results[1].at, 0.05)
+        self.assertLess(results[2].late, 0.05)
+
+        self.simulator.mask = 0
+        results = replay(records, *self.simulator.address, speed=None)
+        self.assertTrue(all(result.match for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import socket
+import time
+import unittest
+from usrr16 import UsrR16
+from usrr16.simulator import SimulatedBoard, UsrR16Simulator
+
+
+class TestSimulatedBoard(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.board = SimulatedBoard()
+
+    def test_commands(self):
+        self.board.handle(UsrR16.req_gen(relay=3, command=2))
+        self.board.handle(UsrR16.req_gen(relay=16, command=3))
+        self.assertEqual(self.board.mask, 0x8004)
+
+        self.board.handle(UsrR16.req_gen(relay=3, command=1))
+        self.assertEqual(self.board.mask, 0x8000)
+
+        self.board.handle(UsrR16.req_gen(relay=0, command=5))
+        self.assertEqual(self.board.mask, 0x0000)
+
+    def test_state_reply(self):
+        self.board.mask = 0x0108
+
+        self.assertEqual(
+            self.board.handle(UsrR16.req_gen(relay=0, command=0x0a)),
+            b'\xaa\x55\x00\x04\x00\x8a\x08\x01\x97'
+        )
+
+    def test_login(self):
+        self.assertEqual(self.board.login(b'admin'), b'OK')
+        self.assertNotEqual(self.board.login(b'nimda'), b'OK')
+
+
+class TestUsrR16Simulator(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator().start()
+
+    def tearDown(self) -> None:
+        self.simulator.stop()
+
+    def test_client(self):
+        r16 = UsrR16(*self.simulator.address)
+        r16.turn_on(1)
+        r16.turn_on(9)
+
+        self.assertEqual(self.simulator.mask, 0x0101)
+        self.assertEqual(r16.state_all(), 0x0101)
+        r16.close()
+
+    def test_wrong_password(self):
+        with self.assertRaises(ConnectionError):
+            UsrR16(*self.simulator.address, password='nimda')
+
+    def test_fragmented_frames(self):
+        with socket.create_connection(self.simulator.address) as sock:
+            sock.sendall(b'adm')
+            sock.sendall(b'in\r\n')
+            self.assertEqual(sock.recv(16), b'OK')
+
+            frame = bytes(UsrR16.req_gen(relay=2, command=2))
+            sock.sendall(frame[:3])
+            time.sleep(0.01)
+            sock.sendall(frame[3:])
+            self.assertEqual(sock.recv(16)[5], 0x82)
+            self.assertEqual(self.simulator.mask, 0x0002)
+
+    def test_latency(self):
+        self.simulator.latency = 0.05
+        r16 = UsrR16(*self.simulator.address)
+
+        start = time.monotonic()
+        r16.state_all()
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        r16.close()
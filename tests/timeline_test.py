@@ -0,0 +1,62 @@
+import time
+import unittest
+from usrr16 import UsrR16
+from usrr16.simulator import UsrR16Simulator
+from usrr16.timeline import Timeline
+
+
+class RecordingR16:
+    """
+    Stands for UsrR16, records pipelined batches and when they were sent
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches = []
+
+    def pipeline(self, commands) -> list:
+        self.batches.append((time.monotonic(), list(commands)))
+        time.sleep(self.delay)
+        return [True] * len(commands)
+
+
+class TestTimeline(unittest.TestCase):
+
+    def test_batches(self):
+        timeline = Timeline(tick=0.005)
+        timeline.invert(0.1, 2).invert(0, 1).turn_on(0.102, 3).turn_off_all(0.2)
+
+        self.assertEqual(timeline.batches(), [
+            (0, [(1, 3)]),
+            (0.1, [(2, 3), (3, 2)]),
+            (0.2, [(0, 5)]),
+        ])
+        self.assertEqual(timeline.duration, 0.2)
+
+    def test_no_drift(self):
+        # each send takes 15ms, sleeps between them must not add it up
+        r16 = RecordingR16(delay=0.015)
+        timeline = Timeline((i * 0.02, i + 1, 3) for i in range(10))
+
+        start = time.monotonic()
+        results = timeline.run(r16, start=start)
+
+        self.assertEqual(len(results), 10)
+        # with a sleep after each send the last one would go at ~0.315s
+        self.assertLess(r16.batches[-1][0] - start, 0.18 + 0.04)
+        for result in results:
+            self.assertLess(result.late, 0.04)
+
+    def test_late_steps_reported(self):
+        r16 = RecordingR16(delay=0.03)
+        results = Timeline([(0, 1, 2), (0.01, 2, 2)]).run(r16)
+
+        self.assertGreater(results[1].late, 0.015)
+
+    def test_device(self):
+        with UsrR16Simulator() as simulator, UsrR16(*simulator.address) as r16:
+            timeline = Timeline([(0.01 * i, i, 2) for i in range(1, 17)] + [(0.2, 4, 3)])
+            results = timeline.run(r16)
+
+            self.assertTrue(all(result.ok for result in results))
+            self.assertEqual(simulator.mask, 0xFFF7)
@@ -0,0 +1,86 @@
+import unittest
+from usrr16 import UsrR16, Metrics
+from usrr16.simulator import SimulatedBoard, UsrR16Simulator
+from usrr16.transport import LoopbackTransport, SerialTransport, TcpTransport
+
+try:
+    import serial
+except ImportError:
+    serial = None
+
+
+class TestLoopback(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.transport = LoopbackTransport()
+        self.relay_r16 = UsrR16(transport=self.transport)
+
+    def tearDown(self) -> None:
+        self.relay_r16.close()
+
+    def test_commands(self):
+        self.relay_r16.turn_on(1)
+        self.relay_r16.invert(16)
+        self.assertEqual(self.transport.board.mask, 0x8001)
+        self.assertEqual(self.relay_r16.state_all(), 0x8001)
+        self.assertTrue(self.relay_r16.state(16))
+
+        self.assertEqual(self.relay_r16.pipeline([(rel, 2) for rel in range(1, 17)]), [True] * 16)
+        self.assertEqual(self.relay_r16.set_mask(0x00F0), 0x00F0)
+
+        self.relay_r16.turn_off_all()
+        self.assertEqual(self.transport.board.mask, 0)
+
+    def test_names(self):
+        self.assertEqual(self.relay_r16.host, 'loopback')
+        self.assertEqual(self.relay_r16.board, 'loopback')
+
+    def test_reconnect(self):
+        self.relay_r16.connect()
+        self.relay_r16.turn_on(2)
+        self.assertEqual(self.transport.board.mask, 0x0002)
+
+    def test_wrong_password(self):
+        with self.assertRaises(ConnectionError):
+            UsrR16(password='wrong', transport=LoopbackTransport(SimulatedBoard(password='secret')))
+
+    def test_metrics(self):
+        metrics = Metrics()
+        with UsrR16(transport=LoopbackTransport(), metrics=metrics) as r16:
+            r16.state_all()
+        self.assertEqual(metrics.snapshot()['latency']['loopback']['state']['count'], 1)
+
+
+class TestTransports(unittest.TestCase):
+
+    def test_tcp(self):
+        with UsrR16Simulator() as simulator:
+            transport = TcpTransport(*simulator.address)
+            self.assertEqual(str(transport), '%s:%d' % simulator.address)
+
+            with UsrR16(transport=transport) as r16:
+                r16.turn_on(3)
+            self.assertEqual(simulator.mask, 0x0004)
+
+    def test_host_required(self):
+        with self.assertRaises(ValueError):
+            UsrR16()
+
+    @unittest.skipIf(serial is None, "pyserial is not installed")
+    def test_serial_loop(self):
+        # pyserial loop:// port echoes writes, enough to check the connection wrapper
+        connection = SerialTransport('loop://').connect(timeout=0.1)
+        connection.sendall(b'\xaa\x55')
+        buffer = bytearray(16)
+        self.assertEqual(connection.recv_into(buffer, 16), 2)
+        self.assertEqual(bytes(buffer[:2]), b'\xaa\x55')
+        connection.close()
+
+    @unittest.skipIf(serial is not None, "pyserial is installed")
+    def test_serial_missing(self):
+        with self.assertRaises(ImportError):
+            SerialTransport('/dev/ttyUSB0').connect()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,79 +1,403 @@
+import os
+import socket
+import threading
 import unittest
 import time
-from usrr16 import UsrR16
+from usrr16 import UsrR16, RelayMask
+from usrr16.codec import FrameError
+from usrr16.metrics import Hook
+from usrr16.pacing import Pacer
+from usrr16.simulator import UsrR16Simulator
 
-delay = 0.1     # if tests stacked, set it a little bit bigger
+HOST = os.environ.get('USRR16_HOST')  # example: USRR16_HOST=192.168.0.27
 
 
 class TestUsrR16(unittest.TestCase):
     """
-    Set right data in setUpClass method to connect to your device !!!
+    Tests run against local UsrR16Simulator by default,
+    set USRR16_HOST environment variable to run them on your device !!!
 
     P.S. currently UsrR16.state() is trustable function
     """
 
     @classmethod
     def setUpClass(cls) -> None:
-        cls.relay_r16 = UsrR16(host='192.168.0.27')
+        cls.simulator = None
+
+        if HOST:
+            # the board garbles commands coming too fast, pacing finds the safe rate
+            cls.relay_r16 = UsrR16(host=HOST, pacing=Pacer())
+        else:
+            cls.simulator = UsrR16Simulator().start()
+            cls.relay_r16 = UsrR16(*cls.simulator.address)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.relay_r16.close()
+
+        if cls.simulator:
+            cls.simulator.stop()
 
     def tearDown(self) -> None:
         # turn of all
-        self.relay_r16.sock.send(bytearray(b'U\xaa\x00\x03\x00\x05\x00\x03'))
-        self.relay_r16.sock.recv(512)
+        self.relay_r16.turn_off_all()
 
     def test_turn_on_off(self):
         for rel in range(1, 17):
             # on test
-            time.sleep(delay)
             self.relay_r16.turn_on(rel)
-            time.sleep(delay)
             self.assertTrue(self.relay_r16.state(rel))
 
             # off test
-            time.sleep(delay)
             self.relay_r16.turn_off(rel)
-            time.sleep(delay)
             self.assertFalse(self.relay_r16.state(rel))
 
     def test_invert(self):
         # for turned on relay
         for rel in range(1, 17):
-            time.sleep(delay)
             self.relay_r16.turn_on(rel)
-            time.sleep(delay)
             self.assertTrue(self.relay_r16.state(rel))
 
-            time.sleep(delay)
             self.relay_r16.invert(rel)
-            time.sleep(delay)
             self.assertFalse(self.relay_r16.state(rel))
 
         # for turned off relay
         for rel in range(1, 17):
-            time.sleep(delay)
             self.relay_r16.turn_off(rel)
-            time.sleep(delay)
             self.assertFalse(self.relay_r16.state(rel))
 
-            time.sleep(delay)
             self.relay_r16.invert(rel)
-            time.sleep(delay)
             self.assertTrue(self.relay_r16.state(rel))
 
     def test_turn_off_all(self):
         # turning of all relays
         for rel in range(1, 17):
-            time.sleep(delay)
             self.relay_r16.turn_on(rel)
-            time.sleep(delay)
             self.assertTrue(self.relay_r16.state(rel))
 
-        time.sleep(delay)
         self.relay_r16.turn_off_all()
 
         # checking is all off
         for rel in range(1, 17):
-            time.sleep(delay)
             print('.', end='')
             self.assertFalse(self.relay_r16.state(rel))
 
+    def test_state_all(self):
+        relays = [1, 8, 9, 16]
+
+        for rel in relays:
+            self.relay_r16.turn_on(rel)
+
+        mask = self.relay_r16.state_all()
+
+        self.assertEqual(mask.enabled(), relays)
+        for rel in range(1, 17):
+            self.assertEqual(mask[rel], rel in relays)
+
+    def test_pipeline(self):
+        result = self.relay_r16.pipeline([(rel, 2) for rel in range(1, 17)] + [(4, 3), (16, 1)])
+
+        self.assertEqual(result, [True] * 18)
+        self.assertEqual(self.relay_r16.state_all(), 0x7FF7)
+
+        answers = self.relay_r16.send_batch([self.relay_r16.req_gen(relay=0, command=5),
+                                             self.relay_r16.req_gen(relay=0, command=0x0a)])
+        self.assertEqual(RelayMask.from_reply(answers[1]), 0x0000)
+
+    def test_set_mask(self):
+        for target in (0x8003, 0x8001, 0xFFFF, 0x0000, 0x00FF, 0xFF00):
+            self.assertEqual(self.relay_r16.set_mask(target), target)
+            self.assertEqual(self.relay_r16.state_all(), target)
+
+
+class TestStateCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator().start()
+        self.board = self.simulator.board
+        self.relay_r16 = UsrR16(*self.simulator.address, cache_ttl=60)
+
+    def tearDown(self) -> None:
+        self.relay_r16.close()
+        self.simulator.stop()
+
+    def test_write_through(self):
+        self.relay_r16.state_all()
+        self.relay_r16.turn_on(1)
+        self.relay_r16.invert(16)
+        self.relay_r16.pipeline([(2, 2), (1, 1)])
+        requests = self.board.requests
+
+        self.assertEqual(self.relay_r16.state_all(), 0x8002)
+        self.assertTrue(self.relay_r16.state(2))
+        self.assertEqual(self.board.requests, requests)
+
+    def test_whole_board_commands(self):
+        self.relay_r16.turn_off_all()
+        self.relay_r16.turn_on(3)
+        requests = self.board.requests
+
+        self.assertEqual(self.relay_r16.state_all(), 0x0004)
+        self.assertEqual(self.board.requests, requests)
+
+    def test_unknown_state(self):
+        self.relay_r16.turn_on(1)
+        self.assertEqual(self.relay_r16.state_all(), 0x0001)
+        self.assertEqual(self.board.requests, 2)
+
+    def test_invalidate_and_ttl(self):
+        self.relay_r16.state_all()
+        self.simulator.mask = 0x0010
+
+        self.assertEqual(self.relay_r16.state_all(), 0x0000)
+        self.assertEqual(self.relay_r16.state_all(max_age=0), 0x0010)
+
+        self.simulator.mask = 0x0020
+        self.relay_r16.invalidate()
+        self.assertEqual(self.relay_r16.state_all(), 0x0020)
+
+        self.simulator.mask = 0x0040
+        self.assertEqual(self.relay_r16.refresh(), 0x0040)
+
+        self.relay_r16.cache_ttl = 0.01
+        self.simulator.mask = 0x0080
+        time.sleep(0.02)
+        self.assertEqual(self.relay_r16.state_all(), 0x0080)
+
+    def test_failed_command(self):
+        self.relay_r16.state_all()
+        self.relay_r16.timeout = 0.05
+        self.simulator.latency = 0.1
+
+        # the board inverts relay 1, but the answer is late
+        with self.assertRaises(OSError):
+            self.relay_r16.invert(1)
+
+        self.simulator.latency = 0.0
+        time.sleep(0.1)
+        self.assertEqual(self.relay_r16.state_all(), 0x0001)
+
+    def test_set_mask_reads_device(self):
+        self.relay_r16.state_all()
+        self.simulator.mask = 0x5555
+
+        self.assertEqual(self.relay_r16.set_mask(0xAAAA), 0xAAAA)
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator(latency=0.05).start()
+        self.relay_r16 = UsrR16(*self.simulator.address)
+
+    def tearDown(self) -> None:
+        self.relay_r16.close()
+        self.simulator.stop()
+
+    def test_burst(self):
+        self.simulator.mask = 0x00F0
+        requests = self.simulator.board.requests
+        barrier = threading.Barrier(16)
+        results = {}
+
+        def read(relay):
+            barrier.wait()
+            results[relay] = self.relay_r16.state(relay)
+
+        threads = [threading.Thread(target=read, args=(relay,)) for relay in range(1, 17)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {relay: 5 <= relay <= 8 for relay in range(1, 17)})
+        # a late thread may start the second request, but not more
+        self.assertLessEqual(self.simulator.board.requests - requests, 2)
+
+    def test_error_shared(self):
+        self.simulator.stop()
+        errors = []
+        barrier = threading.Barrier(4)
+
+        def read():
+            barrier.wait()
+            try:
+                self.relay_r16.state_all()
+            except OSError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 4)
+        self.assertIsNone(self.relay_r16._flight)
+
+    def test_no_join_after_own_write(self):
+        refresh = self.relay_r16.refresh
+
+        def slow_refresh():
+            # the reader is slow to finish after its answer came
+            mask = refresh()
+            time.sleep(0.1)
+            return mask
+
+        self.relay_r16.refresh = slow_refresh
+        reader = threading.Thread(target=self.relay_r16.state_all)
+        reader.start()
+        time.sleep(0.02)
+
+        self.relay_r16.turn_on(1)
+        self.assertTrue(self.relay_r16.state(1))
+        reader.join()
+
+
+class TestConnection(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator().start()
+
+    def tearDown(self) -> None:
+        self.simulator.stop()
+
+    def test_timeout(self):
+        with UsrR16(*self.simulator.address, timeout=0.05) as r16:
+            self.simulator.latency = 0.2
+            start = time.monotonic()
+
+            with self.assertRaises(OSError):
+                r16.state_all()
+            self.assertLess(time.monotonic() - start, 0.15)
+
+            # late answer is not taken as an answer on the next request
+            self.simulator.latency = 0
+            self.simulator.mask = 0x0003
+            self.assertEqual(r16.state_all(), 0x0003)
+
+    def test_reconnect_and_retry(self):
+        with UsrR16(*self.simulator.address, retries=2, backoff=0.01) as r16:
+            self.simulator.drop_connections()
+            r16.turn_on(5)
+            self.assertEqual(self.simulator.mask, 0x0010)
+
+    def test_no_retry_for_invert(self):
+        with UsrR16(*self.simulator.address, retries=2, backoff=0.01) as r16:
+            self.simulator.drop_connections()
+
+            with self.assertRaises(OSError):
+                r16.invert(5)
+
+            # reconnected on the next call
+            r16.invert(5)
+            self.assertEqual(self.simulator.mask, 0x0010)
+
+    def test_keepalive(self):
+        with UsrR16(*self.simulator.address, keepalive=0.02):
+            time.sleep(0.1)
+            self.assertGreater(self.simulator.board.requests, 1)
+
+    def test_keepalive_reconnect(self):
+        with UsrR16(*self.simulator.address, keepalive=0.02) as r16:
+            self.simulator.drop_connections()
+            time.sleep(0.15)
+
+            # no retries, so it works only if keepalive has reconnected
+            r16.turn_on(1)
+            self.assertEqual(self.simulator.mask, 0x0001)
+
+    def test_keepalive_broken_answer(self):
+        with UsrR16(*self.simulator.address, keepalive=0.02) as r16:
+            refresh = r16.refresh
+            calls = []
+
+            def broken():
+                calls.append(1)
+                if len(calls) == 1:
+                    raise FrameError("Broken answer on state request")
+                return refresh()
+
+            r16.refresh = broken
+            time.sleep(0.15)
+            self.assertGreater(len(calls), 1)
+
+    def test_hook_error(self):
+        class Failing(Hook):
+            failed = False
+
+            def on_recv(self, data):
+                if not self.failed:
+                    self.failed = True
+                    raise RuntimeError("hook failed")
+
+        with UsrR16(*self.simulator.address) as r16:
+            r16.hooks.append(Failing())
+
+            with self.assertRaises(RuntimeError):
+                r16.pipeline([(1, 2), (2, 2), (3, 2)])
+
+            # answers left after the error are not taken as the state
+            self.assertEqual(r16.state_all(), 0x0007)
+
+    def test_closed(self):
+        r16 = UsrR16(*self.simulator.address)
+        r16.close()
+
+        with self.assertRaises(ConnectionError):
+            r16.turn_on(1)
+        self.assertEqual(self.simulator.mask, 0x0000)
+
+    def test_silent_host(self):
+        # accepts connections, never answers the password line
+        with socket.socket() as server:
+            server.bind(('127.0.0.1', 0))
+            server.listen(1)
+            start = time.monotonic()
+
+            with self.assertRaises(OSError):
+                UsrR16(*server.getsockname(), connect_timeout=0.05)
+            self.assertLess(time.monotonic() - start, 1.0)
+
+
+class TestMaskCommands(unittest.TestCase):
+
+    def test_per_relay(self):
+        self.assertEqual(UsrR16.mask_commands(0x0003, 0x0006), [(3, 2), (1, 1)])
+        self.assertEqual(UsrR16.mask_commands(0x1234, 0x1234), [])
+
+    def test_all_off(self):
+        self.assertEqual(UsrR16.mask_commands(0x00FF, 0x0100), [(0, 5), (9, 2)])
+        # relay 1 stays on, all off would blink it
+        self.assertEqual(len(UsrR16.mask_commands(0x00FF, 0x0101)), 8)
+        self.assertEqual(UsrR16.mask_commands(0x00FF, 0x0101, allow_glitch=True), [(0, 5), (1, 2), (9, 2)])
+
+    def test_all_on(self):
+        self.assertEqual(UsrR16.mask_commands(0x0000, 0xFFFF), [(0, 2)])
+        self.assertEqual(UsrR16.mask_commands(0x0003, 0xFFFE), [(0, 2), (1, 1)])
+
+    def test_invert_all(self):
+        self.assertEqual(UsrR16.mask_commands(0x5555, 0xAAAA), [(0, 3)])
+
+
+class TestRelayMask(unittest.TestCase):
+
+    def test_from_reply(self):
+        mask = RelayMask.from_reply(b'\xaa\x55\x00\x04\x00\x81\x08\x01\x8d')
+
+        self.assertEqual(mask, 0x0108)
+        self.assertEqual(mask.enabled(), [4, 9])
+        self.assertEqual(list(mask), [rel in (4, 9) for rel in range(1, 17)])
+
+    def test_from_reply_not_state(self):
+        # acknowledgement of "on 1" is not a state reply
+        with self.assertRaises(FrameError):
+            RelayMask.from_reply(b'\xaa\x55\x00\x03\x00\x82\x01\x86')
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            RelayMask(0x10000)
+
+        with self.assertRaises(ValueError):
+            RelayMask(0)[17]
+
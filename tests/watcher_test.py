@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+import unittest
+from usrr16 import UsrR16
+from usrr16.simulator import UsrR16Simulator
+from usrr16.watcher import RelayChange, diff
+
+
+class TestDiff(unittest.TestCase):
+
+    def test_diff(self):
+        self.assertEqual(diff(0x0003, 0x8002, at=1.0), [
+            RelayChange(1, True, False, 1.0),
+            RelayChange(16, False, True, 1.0),
+        ])
+        self.assertEqual(diff(0x1234, 0x1234), [])
+
+
+class TestWatcher(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.simulator = UsrR16Simulator().start()
+        self.relay_r16 = UsrR16(*self.simulator.address)
+
+    def tearDown(self) -> None:
+        self.relay_r16.close()
+        self.simulator.stop()
+
+    def test_shared(self):
+        self.assertIs(self.relay_r16.watch(), self.relay_r16.watch())
+
+    def test_watch_during_io(self):
+        busy = threading.Event()
+        release = threading.Event()
+
+        def io():
+            with self.relay_r16._lock:
+                busy.set()
+                release.wait(1)
+
+        thread = threading.Thread(target=io)
+        thread.start()
+        busy.wait(1)
+        start = time.monotonic()
+        self.relay_r16.watch()
+        self.assertLess(time.monotonic() - start, 0.5)
+        release.set()
+        thread.join()
+
+    def test_close_during_poll(self):
+        watcher = self.relay_r16.watch(min_interval=0.01, max_interval=0.01)
+        watcher.start()
+        time.sleep(0.05)
+        self.simulator.latency = 3.0
+        time.sleep(0.05)    # a poll waits for the board
+
+        start = time.monotonic()
+        self.relay_r16.close()
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertFalse(watcher.running)
+
+    def test_callbacks(self):
+        watcher = self.relay_r16.watch(min_interval=0.01, max_interval=0.02)
+        got = []
+        changed = threading.Event()
+
+        def callback(changes, mask):
+            got.extend(changes)
+            changed.set()
+
+        watcher.subscribe(callback)
+        watcher.subscribe(lambda changes, mask: 1 / 0)  # broken consumer doesn't stop others
+        time.sleep(0.05)
+
+        # switched by someone else
+        self.simulator.mask = 0x0101
+        self.assertTrue(changed.wait(1))
+        self.assertEqual([(c.relay, c.old, c.new) for c in got], [(1, False, True), (9, False, True)])
+        self.assertEqual(watcher.mask, 0x0101)
+
+        watcher.unsubscribe(callback)
+        watcher.stop()
+        self.assertFalse(watcher.running)
+
+    def test_adaptive_interval(self):
+        watcher = self.relay_r16.watch(min_interval=0.01, max_interval=0.08, backoff=2)
+        changed = threading.Event()
+        watcher.subscribe(lambda changes, mask: changed.set())
+
+        time.sleep(0.3)
+        self.assertEqual(watcher.interval, 0.08)
+
+        self.simulator.mask = 0x0001
+        self.assertTrue(changed.wait(1))
+        time.sleep(0.005)
+        self.assertLessEqual(watcher.interval, 0.02)
+        watcher.stop()
+
+    def test_events(self):
+        watcher = self.relay_r16.watch(min_interval=0.01, max_interval=0.02)
+
+        async def first_change():
+            async for change in watcher.events():
+                return change
+
+        async def main():
+            task = asyncio.ensure_future(first_change())
+            await asyncio.sleep(0.05)
+            self.simulator.mask = 0x8000
+            return await asyncio.wait_for(task, 1)
+
+        change = asyncio.run(main())
+        self.assertEqual((change.relay, change.old, change.new), (16, False, True))
+        watcher.stop()
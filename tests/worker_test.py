@@ -0,0 +1,106 @@
+import threading
+import unittest
+from usrr16 import UsrR16
+from usrr16.simulator import UsrR16Simulator
+from usrr16.worker import IOWorker, URGENT, NORMAL, POLL
+
+
+class RecordingR16:
+    """
+    Stub device: records writes, blocks the first one until released
+    """
+
+    host = 'stub'
+
+    def __init__(self):
+        self.writes = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def send_batch(self, frames):
+        self.started.set()
+        self.release.wait()
+        self.writes.append([(frame[6], frame[5]) for frame in frames])
+        return [b'\xaa\x55\x00\x04\x00\x8a\x00\x00\x8e' if frame[5] == 0x0a else frame for frame in frames]
+
+
+class TestQueue(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.r16 = RecordingR16()
+        self.worker = IOWorker(self.r16)
+        # first command occupies the worker, the rest is queued
+        self.first = self.worker.turn_on(16)
+        self.r16.started.wait()
+
+    def tearDown(self) -> None:
+        self.r16.release.set()
+        self.worker.close()
+
+    def flush(self) -> list:
+        self.r16.release.set()
+        self.worker.close(cancel=False)
+        return self.r16.writes[1:]
+
+    def test_priority(self):
+        polls = [self.worker.state_all() for _ in range(3)]
+        self.worker.turn_on(1)
+        off = self.worker.turn_off_all()
+
+        self.assertEqual(self.flush(), [[(0, 5), (0, 0x0a)]])
+        self.assertTrue(off.result())
+        self.assertTrue(all(poll.result() == 0 for poll in polls))
+
+    def test_collapse(self):
+        futures = [self.worker.turn_on(3), self.worker.turn_off(3), self.worker.turn_on(3)]
+        self.worker.invert(4)
+        self.worker.invert(4)
+
+        self.assertEqual(self.flush(), [[(3, 2), (4, 3), (4, 3)]])
+        self.assertEqual([future.result() for future in futures], [True, True, True])
+
+    def test_order_kept(self):
+        self.worker.invert(5, priority=POLL)
+        self.worker.turn_on(5, priority=URGENT)
+        self.worker.turn_on(6, priority=NORMAL)
+
+        self.assertEqual(self.flush(), [[(6, 2), (5, 3), (5, 2)]])
+
+    def test_batch_size(self):
+        self.worker.max_batch = 2
+        for relay in range(1, 6):
+            self.worker.invert(relay)
+
+        self.assertEqual(self.flush(), [[(1, 3), (2, 3)], [(3, 3), (4, 3)], [(5, 3)]])
+
+    def test_close_cancels(self):
+        queued = self.worker.turn_on(1)
+        # the first write completes while close() waits for the worker
+        threading.Timer(0.05, self.r16.release.set).start()
+        self.worker.close()
+        self.assertTrue(queued.cancelled())
+        self.assertTrue(self.first.result())
+
+        with self.assertRaises(RuntimeError):
+            self.worker.turn_on(1)
+
+
+class TestWorker(unittest.TestCase):
+
+    def test_device(self):
+        with UsrR16Simulator() as simulator:
+            r16 = UsrR16(*simulator.address)
+            with IOWorker(r16) as worker:
+                futures = [worker.turn_on(relay) for relay in range(1, 5)]
+                self.assertTrue(all(future.result() for future in futures))
+                self.assertEqual(worker.state_all().result(), 0x000F)
+                self.assertTrue(worker.turn_off_all().result())
+                self.assertEqual(simulator.mask, 0)
+
+                with self.assertRaises(ValueError):
+                    worker.turn_on(17)
+            r16.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,37 @@
-from usrr16.usrr16 import UsrR16
+# Public names are imported on first access, so `import usrr16` and the
+# command line tool don't pay for asyncio and other unused modules
+_EXPORTS = {
+    'UsrR16': 'usrr16.usrr16',
+    'RelayMask': 'usrr16.usrr16',
+    'FrameDecoder': 'usrr16.codec',
+    'FrameError': 'usrr16.codec',
+    'AsyncUsrR16': 'usrr16.aio',
+    'UsrR16Fleet': 'usrr16.fleet',
+    'FleetResult': 'usrr16.fleet',
+    'Timeline': 'usrr16.timeline',
+    'StepResult': 'usrr16.timeline',
+    'Watcher': 'usrr16.watcher',
+    'RelayChange': 'usrr16.watcher',
+    'Metrics': 'usrr16.metrics',
+    'Hook': 'usrr16.metrics',
+}
+
+__all__ = list(_EXPORTS)
 
 __version__ = '0.0.2'
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,5 @@
+import sys
+
+from usrr16.cli import main
+
+sys.exit(main())
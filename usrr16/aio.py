@@ -0,0 +1,238 @@
+import asyncio
+
+from usrr16.codec import FrameDecoder, encode
+from usrr16.usrr16 import UsrR16, RelayMask
+
+
+class AsyncUsrR16:
+    def __init__(self, host: str, port: int = 8899, password: str = "admin", timeout: float = None):
+        """
+        Asyncio version of UsrR16, connection is opened by `await connect()`
+        or by `async with`
+
+        async with AsyncUsrR16(host='192.168.0.42') as r16:
+            await r16.turn_on(1)
+
+        :param host: str
+            IP address of host as string, example: "192.168.0.42"
+        :param port: int
+            Port for connection if custom, default value 8899
+        :param password: str
+            Password to login on device, default "admin"
+        :param timeout: float
+            Default timeout in seconds for connect and each command, default None (no timeout)
+        """
+
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self._lock = None
+        self._decoder = None
+
+    req_gen = staticmethod(UsrR16.req_gen)
+
+    async def connect(self, timeout: float = None) -> "AsyncUsrR16":
+        """
+        Open connection and authorise on device
+
+        :param timeout: float
+            Timeout in seconds for connect and auth, default self.timeout
+        """
+
+        self._lock = asyncio.Lock()
+        self._decoder = FrameDecoder()
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            timeout if timeout is not None else self.timeout
+        )
+
+        try:
+            await self.auth(password=self.password, timeout=timeout)
+        except BaseException:
+            await self.close()
+            raise
+
+        return self
+
+    async def close(self):
+        """
+        Close connection
+        """
+
+        writer = self.writer
+        if writer is not None:
+            self.reader = self.writer = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def __aenter__(self) -> "AsyncUsrR16":
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def send_recv(self, data: bytes, bufsize: int = 256, timeout: float = None) -> bytes:
+        """
+        Send data and return the receive as bytes
+
+        If the answer is not received in time or the call is cancelled, connection
+        is closed because the late answer would be taken as an answer on the next request
+
+        :param data: bytes
+            Data to send
+        :param bufsize: int
+            Buffer size for reader.read
+        :param timeout: float
+            Timeout in seconds, default self.timeout
+        :return:
+        """
+
+        return await self._exchange(data, self._read, bufsize, timeout=timeout)
+
+    async def request(self, relay: int, command: int, timeout: float = None) -> bytes:
+        """
+        Send command and receive its answer frame
+
+        :param relay: int
+            Relay's id, 0 - all
+        :param command: int
+            1 - off, 2 - on, 3 - invert, 5 - all off, 0x0a - state
+        :param timeout: float
+            Timeout in seconds, default self.timeout
+        :return: bytes
+            Answer frame
+        """
+
+        return await self._exchange(encode(relay, command), self._read_frame, timeout=timeout)
+
+    async def _exchange(self, data: bytes, read, *args, timeout: float = None) -> bytes:
+        if self._lock is None:
+            raise ConnectionError("Not connected, call connect() first")
+
+        async with self._lock:
+            # connection could be closed while waiting for the lock
+            if self.writer is None:
+                raise ConnectionError("Not connected, call connect() first")
+
+            self.writer.write(data)
+            try:
+                return await asyncio.wait_for(read(*args), timeout if timeout is not None else self.timeout)
+            except BaseException:
+                # timeout, cancel or error: the answer may still come and would be
+                # taken as an answer on the next request, so connection is closed
+                await self.close()
+                raise
+
+    async def _read(self, bufsize: int) -> bytes:
+        await self.writer.drain()
+        return await self.reader.read(bufsize)
+
+    async def _read_frame(self) -> bytes:
+        await self.writer.drain()
+
+        while True:
+            frame = self._decoder.next_frame()
+            if frame is not None:
+                return frame
+
+            chunk = await self.reader.read(256)
+            if not chunk:
+                raise ConnectionError("Connection closed by device")
+            self._decoder.feed(chunk)
+
+    async def auth(self, password: str, timeout: float = None):
+        """
+        Authorisation on device by password
+
+        :param password: str
+            Password to login on device
+        :param timeout: float
+            Timeout in seconds, default self.timeout
+        """
+
+        answer = await self.send_recv(
+            data=password.encode() + b'\x0d' + b'\x0a',
+            bufsize=1024,
+            timeout=timeout
+        )
+
+        if answer != b'OK':
+            raise ConnectionError("Authorisation failed | Password incorrect")
+
+    async def state_all(self, timeout: float = None) -> RelayMask:
+        """
+        Get states of all relays by one request
+
+        :param timeout: float
+            Timeout in seconds, default self.timeout
+        :return: RelayMask
+            16-bit mask, bit n-1 is set if relay n is turned on
+        """
+
+        return RelayMask.from_reply(await self.request(relay=0, command=0x0a, timeout=timeout))
+
+    async def state(self, relay: int, timeout: float = None) -> bool:
+        """
+        Get relay status as boolean
+
+        :param relay: int
+            Relay's id
+        :param timeout: float
+            Timeout in seconds, default self.timeout
+        :return: bool
+            Is this relay turned on
+        """
+
+        return (await self.state_all(timeout=timeout))[relay]
+
+    async def turn_off(self, relay: int, timeout: float = None):
+        """
+        Turn off relay
+
+        :param relay: int
+            Relay's id
+        :param timeout: float
+            Timeout in seconds, default self.timeout
+        """
+
+        await self.request(relay=relay, command=1, timeout=timeout)
+
+    async def turn_on(self, relay: int, timeout: float = None):
+        """
+        Turn on relay
+
+        :param relay: int
+            Relay's id
+        :param timeout: float
+            Timeout in seconds, default self.timeout
+        """
+
+        await self.request(relay=relay, command=2, timeout=timeout)
+
+    async def invert(self, relay: int, timeout: float = None):
+        """
+        Invert relay's state
+
+        :param relay: int
+            Relay's id
+        :param timeout: float
+            Timeout in seconds, default self.timeout
+        """
+
+        await self.request(relay=relay, command=3, timeout=timeout)
+
+    async def turn_off_all(self, timeout: float = None):
+        """
+        Turn off all relays
+
+        :param timeout: float
+            Timeout in seconds, default self.timeout
+        """
+
+        await self.request(relay=0, command=5, timeout=timeout)
@@ -0,0 +1,264 @@
+"""
+Command line tool
+
+usrr16 --host 192.168.0.99 on 1 2 3
+usrr16 --host 192.168.0.99 state 4
+usrr16 --host 192.168.0.99 snapshot --json
+printf 'on 1\\nstate 1\\nall-off\\n' | usrr16 --host 192.168.0.99 batch
+usrr16 discover 192.168.0.0/24
+
+Host and password default to USRR16_HOST and USRR16_PASSWORD environment variables.
+With --gateway (or USRR16_GATEWAY) commands go to a running gateway's Unix socket
+instead, see usrr16.gateway.
+"""
+
+import argparse
+import os
+import sys
+
+USAGE_ERROR = 2
+
+COMMANDS = ('on', 'off', 'invert', 'all-off', 'state', 'snapshot')
+
+
+def relay_id(value: str) -> int:
+    relay = int(value)
+    if not 1 <= relay <= 16:
+        raise ValueError(f"Relay's id should be 1-16, got {relay}")
+    return relay
+
+
+def snapshot_text(mask: int) -> str:
+    """
+    Relays state as 16 characters, relay 1 first, 1 - on
+    """
+
+    return ''.join('1' if mask >> i & 1 else '0' for i in range(16))
+
+
+def execute(r16, words: list, as_json: bool = False) -> tuple:
+    """
+    Run one command
+
+    :param r16: UsrR16
+    :param words: list
+        Command name and its arguments, e.g. ['on', '1', '2']
+    :param as_json: bool
+        Print snapshot as JSON
+    :return: tuple
+        (output line, success)
+    """
+
+    command, args = words[0], words[1:]
+
+    if command in ('on', 'off', 'invert'):
+        if not args:
+            raise ValueError(f"{command}: relay's id expected")
+        code = {'off': 1, 'on': 2, 'invert': 3}[command]
+        # several relays go by one write
+        results = r16.pipeline([(relay_id(arg), code) for arg in args])
+        return ('ok' if all(results) else 'failed'), all(results)
+
+    if command == 'all-off':
+        ok, = r16.pipeline([(0, 5)])
+        return ('ok' if ok else 'failed'), ok
+
+    if command == 'state':
+        if not args:
+            raise ValueError("state: relay's id expected")
+        mask = r16.state_all()
+        return ' '.join('on' if mask[relay_id(arg)] else 'off' for arg in args), True
+
+    if command == 'snapshot':
+        mask = r16.state_all()
+        if as_json:
+            import json
+            return json.dumps({'mask': int(mask), 'on': mask.enabled()}), True
+        return snapshot_text(mask), True
+
+    raise ValueError(f"Unknown command {command!r}, expected one of: {', '.join(COMMANDS)}")
+
+
+def batch(r16, lines, output=None, as_json: bool = False) -> int:
+    """
+    Run a command per line over one connection, print a result line per command
+    as soon as it completes. Empty lines and lines starting with '#' are skipped.
+
+    :param r16: UsrR16
+    :param lines: iterable
+        Command lines, e.g. sys.stdin
+    :param output: file
+        Default sys.stdout
+    :param as_json: bool
+        Print snapshots as JSON
+    :return: int
+        Exit code, 1 if any command failed
+    """
+
+    output = sys.stdout if output is None else output
+    code = 0
+
+    for line in lines:
+        words = line.split()
+        if not words or words[0].startswith('#'):
+            continue
+
+        try:
+            text, ok = execute(r16, words, as_json=as_json)
+        except ValueError as e:
+            text, ok = f"error: {e}", False
+        except OSError as e:
+            # the client reconnects on the next command
+            text, ok = f"error: {e or type(e).__name__}", False
+
+        print(text, file=output, flush=True)
+        if not ok:
+            code = 1
+
+    return code
+
+
+def remote(path: str, command: str, words: list, as_json: bool = False) -> int:
+    """
+    Run commands through a gateway, see usrr16.gateway
+
+    :param path: str
+        Gateway's Unix socket
+    :param command: str
+        Command name or 'batch' to forward stdin
+    :param words: list
+        Command arguments
+    :param as_json: bool
+        Print snapshot as JSON
+    :return: int
+        Exit code
+    """
+
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError as e:
+            print(f"usrr16: can't connect to gateway {path}: {e}", file=sys.stderr)
+            return 1
+
+        stream = sock.makefile('rw', encoding='utf-8')
+        lines = sys.stdin if command == 'batch' else [' '.join([command] + words)]
+        code = 0
+
+        for line in lines:
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+
+            stream.write(' '.join(parts) + '\n')
+            stream.flush()
+            reply = stream.readline().rstrip('\n')
+            if not reply:
+                print("usrr16: gateway closed connection", file=sys.stderr)
+                return 1
+
+            if as_json and parts[0] == 'snapshot' and not reply.startswith('error'):
+                import json
+                mask = sum(1 << i for i, char in enumerate(reply) if char == '1')
+                reply = json.dumps({'mask': mask, 'on': [i + 1 for i in range(16) if mask >> i & 1]})
+
+            print(reply, flush=True)
+            if reply == 'failed' or reply.startswith('error'):
+                code = 1
+
+        return code
+
+
+def discover(targets: list, port: int, password: str, budget: float, as_json: bool = False) -> int:
+    """
+    Print boards found in networks or hosts list, see usrr16.discovery
+
+    :return: int
+        Exit code, 1 if nothing is found
+    """
+
+    from usrr16.discovery import scan
+
+    boards = scan(targets, port=port, password=password, budget=budget, timeout=min(budget, 0.5))
+
+    if as_json:
+        import json
+        print(json.dumps([{'host': board.host, 'port': board.port, 'authorized': board.authorized,
+                           'mask': None if board.mask is None else int(board.mask)} for board in boards]))
+    else:
+        for board in boards:
+            state = snapshot_text(board.mask) if board.authorized else 'wrong password'
+            print(f"{board.host}:{board.port} {state}")
+
+    return 0 if boards else 1
+
+
+def parser() -> argparse.ArgumentParser:
+    result = argparse.ArgumentParser(prog='usrr16', description='USR-R16 relay board control')
+    result.add_argument('--host', default=os.environ.get('USRR16_HOST'), help='board address, default $USRR16_HOST')
+    result.add_argument('--port', type=int, default=8899)
+    result.add_argument('--password', default=os.environ.get('USRR16_PASSWORD', 'admin'),
+                        help='default $USRR16_PASSWORD or "admin"')
+    result.add_argument('--timeout', type=float, default=5.0, help='seconds for connect and each command')
+    result.add_argument('--gateway', default=os.environ.get('USRR16_GATEWAY'),
+                        help="gateway's Unix socket, default $USRR16_GATEWAY")
+    result.add_argument('--budget', type=float, default=1.0, help='seconds for the whole discover scan')
+    result.add_argument('--json', action='store_true', help='print snapshot and discover results as JSON')
+    result.add_argument('command', choices=COMMANDS + ('batch', 'discover'),
+                        help='"batch" reads commands from stdin, "discover" scans networks for boards')
+    result.add_argument('relays', nargs='*', help="relays' ids, 1-16, or networks and hosts to discover")
+    return result
+
+
+def main(argv=None) -> int:
+    args = parser().parse_args(argv)
+
+    if args.command == 'discover':
+        if not args.relays:
+            print("usrr16: discover: network or hosts expected, e.g. 192.168.0.0/24", file=sys.stderr)
+            return USAGE_ERROR
+        return discover(args.relays, args.port, args.password, args.budget, as_json=args.json)
+
+    if args.gateway:
+        return remote(args.gateway, args.command, args.relays, as_json=args.json)
+
+    if not args.host:
+        print("usrr16: --host or USRR16_HOST is required", file=sys.stderr)
+        return USAGE_ERROR
+
+    from usrr16.codec import FrameError
+    from usrr16.usrr16 import UsrR16
+
+    try:
+        r16 = UsrR16(args.host, args.port, password=args.password,
+                     timeout=args.timeout, connect_timeout=args.timeout, retries=1)
+    except OSError as e:
+        print(f"usrr16: can't connect to {args.host}:{args.port}: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        if args.command == 'batch':
+            return batch(r16, sys.stdin, as_json=args.json)
+
+        try:
+            text, ok = execute(r16, [args.command] + args.relays, as_json=args.json)
+        except FrameError as e:
+            print(f"usrr16: {e}", file=sys.stderr)
+            return 1
+        except ValueError as e:
+            print(f"usrr16: {e}", file=sys.stderr)
+            return USAGE_ERROR
+        except OSError as e:
+            print(f"usrr16: {e or type(e).__name__}", file=sys.stderr)
+            return 1
+
+        print(text)
+        return 0 if ok else 1
+    finally:
+        r16.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+USR-R16 frames encoding and decoding
+
+Request:  0x55 0xaa <length 2 bytes> 0x00 <command> <relay> <checksum>
+Answer:   0xaa 0x55 <length 2 bytes> <length bytes of data> <checksum>
+
+Answer checksum is a sum of bytes between header and checksum, & 0xFF.
+"""
+
+REQUEST_HEADER = b'\x55\xaa'
+ANSWER_HEADER = b'\xaa\x55'
+
+# Commands known by device
+OFF = 0x01
+ON = 0x02
+INVERT = 0x03
+OFF_ALL = 0x05
+STATE = 0x0a
+
+COMMANDS = (OFF, ON, INVERT, OFF_ALL, STATE)
+
+COMMAND_NAMES = {OFF: 'off', ON: 'on', INVERT: 'invert', OFF_ALL: 'off_all', STATE: 'state'}
+
+# Answers of the device are short, longer length in header means garbage
+MAX_LENGTH = 64
+
+
+def _build(relay: int, command: int) -> bytes:
+    return bytes([0x55, 0xAA, 0x00, 3, 0x00, command, relay, 3])
+
+
+# All frames of known commands are built once, (command, relay) -> frame
+FRAMES = {(command, relay): _build(relay, command) for command in COMMANDS for relay in range(17)}
+
+
+class FrameError(ValueError):
+    """
+    Answer frame is broken (wrong checksum)
+    """
+
+
+def encode(relay: int, command: int) -> bytes:
+    """
+    Get request frame, prebuilt one for known commands
+
+    :param relay: int
+        Relay number 0-16 (0 - all)
+    :param command: int
+        1 - off, 2 - on, 3 - invert, 5 - all off, 0x0a - state
+    :return: bytes
+    """
+
+    frame = FRAMES.get((command, relay))
+
+    if frame is None:
+        if relay < 0 or relay > 16:
+            raise ValueError(f"Relay value out of range, expected 1-16, got {relay}")
+        frame = _build(relay, command)
+
+    return frame
+
+
+class FrameDecoder:
+    def __init__(self, size: int = 1024):
+        """
+        Incremental decoder of answer frames
+
+        Data is received straight into decoder's buffer and parsed in place,
+        frames split by TCP are waited for, merged ones are split.
+
+        n = sock.recv_into(decoder.writable())
+        decoder.commit(n)
+        frame = decoder.next_frame()
+
+        :param size: int
+            Initial buffer size, grows if needed
+        """
+
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self.skipped = 0    # garbage bytes dropped while looking for a header
+        self.broken = 0     # frames with wrong checksum
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def clear(self):
+        """
+        Drop all buffered data
+        """
+
+        self._start = self._end = 0
+
+    def writable(self, size: int = 256) -> memoryview:
+        """
+        Get free space of the buffer to receive data into, at least `size` bytes
+
+        :param size: int
+            Minimal free space
+        :return: memoryview
+        """
+
+        if self._start == self._end:
+            self._start = self._end = 0
+
+        if len(self._buf) - self._end < size:
+            pending = self._end - self._start
+
+            if pending + size > len(self._buf):
+                buf = bytearray(max(len(self._buf) * 2, pending + size))
+                buf[:pending] = self._view[self._start:self._end]
+                self._view.release()
+                self._buf = buf
+                self._view = memoryview(buf)
+            else:
+                self._view[:pending] = self._view[self._start:self._end]
+
+            self._start, self._end = 0, pending
+
+        return self._view[self._end:]
+
+    def commit(self, size: int):
+        """
+        Mark `size` bytes received into writable() as data
+
+        :param size: int
+        """
+
+        self._end += size
+
+    def feed(self, data: bytes):
+        """
+        Add received data
+
+        :param data: bytes
+        """
+
+        size = len(data)
+        self.writable(size)[:size] = data
+        self._end += size
+
+    def next_frame(self):
+        """
+        Get next complete frame
+
+        :return: bytes or None
+            Frame, None if no complete frame buffered yet
+        :raise FrameError:
+            Frame with wrong checksum, it is dropped from buffer
+        """
+
+        buf, view = self._buf, self._view
+
+        while self._end - self._start >= 4:
+            start = buf.find(ANSWER_HEADER, self._start, self._end)
+
+            if start < 0:
+                # last byte may be the first half of a header
+                keep = 1 if buf[self._end - 1] == ANSWER_HEADER[0] else 0
+                self.skipped += self._end - keep - self._start
+                self._start = self._end - keep
+                return None
+
+            self.skipped += start - self._start
+            self._start = start
+
+            if self._end - start < 4:
+                return None
+
+            length = buf[start + 2] << 8 | buf[start + 3]
+            if length > MAX_LENGTH:
+                self.skipped += 1
+                self._start = start + 1
+                continue
+
+            end = start + 4 + length + 1
+            if end > self._end:
+                return None
+
+            self._start = end
+            if sum(view[start + 2:end - 1]) & 0xFF != buf[end - 1]:
+                self.broken += 1
+                raise FrameError(f"Wrong checksum of answer {bytes(view[start:end])}")
+
+            return bytes(view[start:end])
+
+        return None
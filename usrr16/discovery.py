@@ -0,0 +1,148 @@
+import asyncio
+import ipaddress
+from collections import namedtuple
+
+from usrr16.codec import FrameDecoder, encode, STATE
+from usrr16.usrr16 import RelayMask
+
+# Board found by discovery
+#   authorized - password accepted, mask is read then
+#   mask       - RelayMask, None if not authorized
+Board = namedtuple('Board', ['host', 'port', 'authorized', 'mask'])
+
+
+def expand(targets) -> list:
+    """
+    Hosts to probe
+
+    :param targets: str or iterable
+        Hosts and networks, e.g. "192.168.0.0/24" or ["192.168.0.27", "10.0.0.0/30"]
+    :return: list
+        Host addresses as strings, networks without network and broadcast addresses
+    """
+
+    if isinstance(targets, str):
+        targets = [targets]
+
+    hosts = []
+    for target in targets:
+        try:
+            network = ipaddress.ip_network(target, strict=False)
+        except ValueError:
+            hosts.append(target)    # host name
+            continue
+
+        if network.num_addresses == 1:
+            hosts.append(str(network.network_address))
+        else:
+            hosts.extend(str(host) for host in network.hosts())
+
+    return hosts
+
+
+async def probe(host: str, port: int = 8899, password: str = "admin", timeout: float = 0.5) -> Board:
+    """
+    Check whether host is USR-R16: it answers password line with OK or ERROR,
+    after OK the board must answer state request
+
+    :param host: str
+    :param port: int
+    :param password: str
+    :param timeout: float
+        Seconds for connect and each answer, default 0.5
+    :return: Board
+        None if host is not USR-R16 or unreachable
+    """
+
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    try:
+        writer.write(password.encode() + b'\r\n')
+        answer = await asyncio.wait_for(reader.read(16), timeout)
+
+        if answer == b'ERROR':
+            return Board(host, port, False, None)
+        if answer != b'OK':
+            return None
+
+        writer.write(encode(0, STATE))
+        decoder = FrameDecoder()
+
+        async def read_frame():
+            while True:
+                frame = decoder.next_frame()
+                if frame is not None:
+                    return frame
+                chunk = await reader.read(256)
+                if not chunk:
+                    raise ConnectionError("Connection closed by device")
+                decoder.feed(chunk)
+
+        return Board(host, port, True, RelayMask.from_reply(await asyncio.wait_for(read_frame(), timeout)))
+
+    except (OSError, ValueError, asyncio.TimeoutError):
+        # FrameError is ValueError: something answering OK, but not the board
+        return None
+
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+
+async def discover(targets, port: int = 8899, password: str = "admin", budget: float = 1.0,
+                   timeout: float = 0.5, concurrency: int = 256) -> list:
+    """
+    Probe hosts concurrently, return the boards found within the time budget
+
+    boards = await discover('192.168.0.0/24')
+
+    :param targets: str or iterable
+        Hosts and networks, see expand
+    :param port: int
+        Default 8899
+    :param password: str
+        Default "admin", boards with other password are found as not authorized
+    :param budget: float
+        Seconds for the whole scan, probes not finished by then are dropped, default 1.0
+    :param timeout: float
+        Seconds for connect and each answer of one probe, default 0.5
+    :param concurrency: int
+        Probes at once, default 256
+    :return: list
+        Board for each found board, in order of targets
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(host):
+        async with semaphore:
+            return await probe(host, port, password, timeout)
+
+    tasks = [asyncio.ensure_future(limited(host)) for host in expand(targets)]
+    if not tasks:
+        return []
+
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+
+    return [task.result() for task in tasks if task in done and task.result() is not None]
+
+
+def scan(targets, port: int = 8899, password: str = "admin", budget: float = 1.0, timeout: float = 0.5) -> list:
+    """
+    Blocking version of discover
+
+    for board in scan('192.168.0.0/24'):
+        print(board.host, board.mask)
+    """
+
+    return asyncio.run(discover(targets, port=port, password=password, budget=budget, timeout=timeout))
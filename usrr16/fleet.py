@@ -0,0 +1,216 @@
+import asyncio
+
+from usrr16.aio import AsyncUsrR16
+
+
+class FleetResult(dict):
+    """
+    Per-board (or per (board, relay)) results of a fleet operation,
+    failed entries hold the raised exception instead of the value
+    """
+
+    @property
+    def ok(self) -> dict:
+        """
+        Successful entries only
+        """
+
+        return {key: value for key, value in self.items() if not isinstance(value, BaseException)}
+
+    @property
+    def errors(self) -> dict:
+        """
+        Failed entries only, values are exceptions
+        """
+
+        return {key: value for key, value in self.items() if isinstance(value, BaseException)}
+
+
+class UsrR16Fleet:
+    def __init__(self, boards, port: int = 8899, password: str = "admin", timeout: float = 5.0,
+                 concurrency: int = None):
+        """
+        Many USR-R16 boards driven concurrently from one event loop
+
+        fleet = UsrR16Fleet(['192.168.0.10', '192.168.0.11:8898'], timeout=2)
+        await fleet.connect()
+        await fleet.turn_on([('192.168.0.10', 1), ('192.168.0.11:8898', 5)])
+        await fleet.turn_off_all()
+
+        :param boards: iterable or dict
+            Hosts as "host" or "host:port", or dict of {name: host or AsyncUsrR16}
+        :param port: int
+            Port for hosts given without port, default value 8899
+        :param password: str
+            Password to login on devices, default "admin"
+        :param timeout: float
+            Timeout in seconds for each board operation, default 5.0
+        :param concurrency: int
+            Max number of boards processed at the same time, default None (no limit)
+        """
+
+        items = boards.items() if isinstance(boards, dict) else ((board, board) for board in boards)
+
+        self.boards = {}
+        for name, board in items:
+            if isinstance(board, str):
+                host, _, board_port = board.partition(':')
+                board = AsyncUsrR16(host, int(board_port) if board_port else port, password, timeout)
+            self.boards[name] = board
+
+        self.concurrency = concurrency
+        self._semaphore = None
+
+    async def _call(self, board: AsyncUsrR16, fn, *args):
+        if not self.concurrency:
+            return await fn(board, *args)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with self._semaphore:
+            return await fn(board, *args)
+
+    async def _gather(self, calls: dict) -> FleetResult:
+        values = await asyncio.gather(*calls.values(), return_exceptions=True)
+        return FleetResult(zip(calls.keys(), values))
+
+    async def _each(self, fn, boards=None) -> FleetResult:
+        names = self.boards if boards is None else boards
+        return await self._gather({name: self._call(self.boards[name], fn) for name in names})
+
+    async def _targets(self, fn, targets) -> FleetResult:
+        # relays of one board go one by one through its connection, boards go in parallel
+        by_board = {}
+        for name, relay in targets:
+            by_board.setdefault(name, []).append(relay)
+
+        async def run(board, relays):
+            results = {}
+            for relay in relays:
+                try:
+                    results[relay] = await fn(board, relay)
+                except Exception as e:
+                    results[relay] = e
+            return results
+
+        per_board = await self._gather({
+            name: self._call(self.boards[name], run, relays) for name, relays in by_board.items()
+        })
+
+        result = FleetResult()
+        for name, relays in by_board.items():
+            answers = per_board[name]
+            for relay in relays:
+                result[(name, relay)] = answers if isinstance(answers, BaseException) else answers[relay]
+
+        return result
+
+    async def connect(self, boards=None) -> FleetResult:
+        """
+        Connect and authorise on all boards concurrently
+
+        :param boards: iterable
+            Names of boards, default all
+        :return: FleetResult
+            {board: board or exception}
+        """
+
+        return await self._each(AsyncUsrR16.connect, boards)
+
+    async def close(self):
+        """
+        Close all connections
+        """
+
+        await asyncio.gather(*(board.close() for board in self.boards.values()), return_exceptions=True)
+
+    async def __aenter__(self) -> "UsrR16Fleet":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def state_all(self, boards=None) -> FleetResult:
+        """
+        Get states of all relays of each board
+
+        :param boards: iterable
+            Names of boards, default all
+        :return: FleetResult
+            {board: RelayMask or exception}
+        """
+
+        return await self._each(AsyncUsrR16.state_all, boards)
+
+    async def turn_off_all(self, boards=None) -> FleetResult:
+        """
+        Turn off all relays of each board
+
+        :param boards: iterable
+            Names of boards, default all
+        :return: FleetResult
+            {board: None or exception}
+        """
+
+        return await self._each(AsyncUsrR16.turn_off_all, boards)
+
+    async def state(self, targets) -> FleetResult:
+        """
+        Get states of relays
+
+        :param targets: iterable
+            (board, relay) pairs
+        :return: FleetResult
+            {(board, relay): bool or exception}
+        """
+
+        by_board = {}
+        for name, relay in targets:
+            by_board.setdefault(name, []).append(relay)
+
+        masks = await self.state_all(by_board)
+        result = FleetResult()
+        for name, relays in by_board.items():
+            for relay in relays:
+                mask = masks[name]
+                result[(name, relay)] = mask if isinstance(mask, BaseException) else mask[relay]
+
+        return result
+
+    async def turn_on(self, targets) -> FleetResult:
+        """
+        Turn on relays
+
+        :param targets: iterable
+            (board, relay) pairs
+        :return: FleetResult
+            {(board, relay): None or exception}
+        """
+
+        return await self._targets(AsyncUsrR16.turn_on, targets)
+
+    async def turn_off(self, targets) -> FleetResult:
+        """
+        Turn off relays
+
+        :param targets: iterable
+            (board, relay) pairs
+        :return: FleetResult
+            {(board, relay): None or exception}
+        """
+
+        return await self._targets(AsyncUsrR16.turn_off, targets)
+
+    async def invert(self, targets) -> FleetResult:
+        """
+        Invert relays states
+
+        :param targets: iterable
+            (board, relay) pairs
+        :return: FleetResult
+            {(board, relay): None or exception}
+        """
+
+        return await self._targets(AsyncUsrR16.invert, targets)
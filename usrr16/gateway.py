@@ -0,0 +1,305 @@
+import io
+import json
+import logging
+import os
+import queue
+import re
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from usrr16 import cli
+from usrr16.codec import encode, FrameError, OFF, ON, INVERT, OFF_ALL, STATE
+from usrr16.usrr16 import RelayMask
+
+logger = logging.getLogger(__name__)
+
+
+class Gateway:
+    def __init__(self, r16, max_age: float = 0.05):
+        """
+        One device session shared by many local clients
+
+        Commands of all clients are queued and sent by one dispatcher thread,
+        everything queued while the previous write was in flight goes by the
+        next single write. Each write ends with a state request, so the gateway
+        always knows the board state after its own commands; concurrent state
+        reads share that one request.
+
+        gateway = Gateway(UsrR16(host='192.168.0.99', keepalive=30))
+        gateway.serve_unix('/run/usrr16.sock')
+        gateway.serve_http('127.0.0.1', 8016)
+
+        Unix socket speaks `usrr16 batch` language, a result line per command line.
+        HTTP: GET /state, GET /state/<relay>, POST /relays/<relay>/on|off|invert, POST /all-off
+
+        :param r16: UsrR16
+            Device session, the gateway owns it from now on
+        :param max_age: float
+            State known by the gateway is served without a request while
+            younger than this many seconds, default 0.05
+        """
+
+        self.r16 = r16
+        self.max_age = max_age
+        self.mask = None
+        self.updated = 0.0
+        self._queue = queue.Queue()
+        self._servers = []
+        self._thread = threading.Thread(target=self._run, name=f"usrr16-gateway-{r16.host}", daemon=True)
+        self._thread.start()
+
+    def submit(self, relay: int, command: int) -> Future:
+        """
+        Queue a command
+
+        :param relay: int
+            Relay's id, 0 - all
+        :param command: int
+            1 - off, 2 - on, 3 - invert, 5 - all off, 10 - state
+        :return: Future
+            bool - device acknowledged the command, RelayMask for state request
+        """
+
+        future = Future()
+        self._queue.put((encode(relay, command), future))
+        return future
+
+    def pipeline(self, commands) -> list:
+        """
+        Same as UsrR16.pipeline, commands go by one write with other clients' ones
+
+        :param commands: iterable
+            (relay, command) pairs
+        :return: list
+            Success of each command
+        """
+
+        futures = [self.submit(relay, command) for relay, command in commands]
+        return [future.result() for future in futures]
+
+    def state_all(self, max_age: float = None) -> RelayMask:
+        """
+        Relays state, from the gateway's view if it is fresh enough
+
+        :param max_age: float
+            Max age of the known state in seconds, default self.max_age
+        :return: RelayMask
+        """
+
+        mask = self.mask
+        if mask is not None and time.monotonic() - self.updated <= (self.max_age if max_age is None else max_age):
+            return mask
+
+        return self.submit(0, STATE).result()
+
+    def state(self, relay: int, max_age: float = None) -> bool:
+        return self.state_all(max_age=max_age)[relay]
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            # everything queued during the previous write goes by this one
+            items = [item]
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                items.append(item)
+
+            commands = [(frame, future) for frame, future in items if frame[5] != STATE]
+            frames = [frame for frame, _ in commands] + [encode(0, STATE)]
+
+            try:
+                answers = self.r16.send_batch(frames)
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), answer in zip(commands, answers):
+                future.set_result(answer is not None)
+
+            try:
+                if answers[-1] is None:
+                    raise FrameError("Broken answer on state request")
+                self.mask, self.updated = RelayMask.from_reply(answers[-1]), time.monotonic()
+            except FrameError as error:
+                self.mask = None
+                for frame, future in items:
+                    if frame[5] == STATE:
+                        future.set_exception(error)
+                continue
+
+            for frame, future in items:
+                if frame[5] == STATE:
+                    future.set_result(self.mask)
+
+    def _serve(self, server):
+        server.gateway = self
+        self._servers.append(server)
+        threading.Thread(target=server.serve_forever, args=(0.1,), daemon=True).start()
+        return server
+
+    def serve_unix(self, path: str):
+        """
+        Serve line protocol on Unix socket in background, same commands as `usrr16 batch`
+
+        :param path: str
+            Socket path, stale socket file is replaced
+        """
+
+        if os.path.exists(path):
+            os.unlink(path)
+
+        return self._serve(_UnixServer(path, _LineHandler))
+
+    def serve_http(self, host: str = '127.0.0.1', port: int = 8016):
+        """
+        Serve JSON API over HTTP in background
+
+        :param host: str
+        :param port: int
+            Default 8016, 0 - any free port
+        """
+
+        return self._serve(_HTTPServer((host, port), _HTTPHandler))
+
+    def close(self):
+        """
+        Stop servers and the dispatcher, close device session
+        """
+
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+            if isinstance(server, _UnixServer) and os.path.exists(server.server_address):
+                os.unlink(server.server_address)
+        self._servers.clear()
+
+        self._queue.put(None)
+        self._thread.join()
+        self.r16.close()
+
+    def __enter__(self) -> "Gateway":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class _LineHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        lines = io.TextIOWrapper(self.rfile, encoding='utf-8', errors='replace')
+        output = io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True)
+        try:
+            cli.batch(self.server.gateway, lines, output)
+        except OSError:
+            pass    # client went away
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    STATE = re.compile(r'^/state(?:/(\d+))?$')
+    RELAY = re.compile(r'^/relays/(\d+)/(on|off|invert)$')
+    COMMANDS = {'on': ON, 'off': OFF, 'invert': INVERT}
+
+    def reply(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def call(self, function, *args):
+        try:
+            self.reply(200, function(*args))
+        except (ValueError, IndexError) as e:
+            status = 502 if isinstance(e, FrameError) else 400
+            self.reply(status, {'error': str(e)})
+        except OSError as e:
+            self.reply(502, {'error': str(e) or type(e).__name__})
+
+    def do_GET(self):
+        gateway = self.server.gateway
+        match = self.STATE.match(self.path)
+        if match is None:
+            return self.reply(404, {'error': 'not found'})
+
+        def state(relay):
+            mask = gateway.state_all()
+            if relay is None:
+                return {'mask': int(mask), 'on': mask.enabled()}
+            return {'relay': int(relay), 'on': mask[int(relay)]}
+
+        self.call(state, match.group(1))
+
+    def do_POST(self):
+        gateway = self.server.gateway
+
+        if self.path == '/all-off':
+            return self.call(lambda: {'ok': gateway.pipeline([(0, OFF_ALL)])[0]})
+
+        match = self.RELAY.match(self.path)
+        if match is None:
+            return self.reply(404, {'error': 'not found'})
+
+        def command(relay, name):
+            return {'ok': gateway.pipeline([(cli.relay_id(relay), self.COMMANDS[name])])[0]}
+
+        self.call(command, *match.groups())
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+if __name__ == '__main__':
+    import argparse
+    from usrr16.usrr16 import UsrR16
+
+    parser = argparse.ArgumentParser(description='USR-R16 gateway, one device session for many local clients')
+    parser.add_argument('--host', default=os.environ.get('USRR16_HOST'), required='USRR16_HOST' not in os.environ)
+    parser.add_argument('--port', type=int, default=8899)
+    parser.add_argument('--password', default=os.environ.get('USRR16_PASSWORD', 'admin'))
+    parser.add_argument('--unix', help='Unix socket path')
+    parser.add_argument('--http', help='HTTP address, host:port')
+    parser.add_argument('--max-age', type=float, default=0.05, help='seconds a known state is served from memory')
+    args = parser.parse_args()
+
+    if not args.unix and not args.http:
+        parser.error('--unix or --http is required')
+
+    r16 = UsrR16(args.host, args.port, password=args.password, timeout=5, connect_timeout=5, retries=2, keepalive=30)
+    gateway = Gateway(r16, max_age=args.max_age)
+
+    if args.unix:
+        gateway.serve_unix(args.unix)
+        print(f"USR-R16 gateway for {args.host}:{args.port} on {args.unix}")
+    if args.http:
+        http_host, _, http_port = args.http.rpartition(':')
+        gateway.serve_http(http_host or '127.0.0.1', int(http_port))
+        print(f"USR-R16 gateway for {args.host}:{args.port} on http://{args.http}")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gateway.close()
@@ -0,0 +1,163 @@
+import bisect
+import os
+import struct
+import threading
+import time
+from array import array
+
+from usrr16.usrr16 import RelayMask
+from usrr16.watcher import diff
+
+# On-disk sample: time.time() (float64), 16-bit mask, little-endian, 10 bytes
+_SAMPLE = struct.Struct('<dH')
+
+
+class History:
+    def __init__(self, path: str = None):
+        """
+        Relays state history of one board, a sample is kept only when the state changes
+
+        Samples live in two typed arrays (8 + 2 bytes per change), appended to
+        `path` if given and loaded from it on start, e.g. 1000 changes a day
+        for 3 months take under 1 MB.
+
+        history = History('board-27.r16h')
+        r16 = UsrR16(host='192.168.0.27', history=history)
+        r16.watch().start()                  # polls, reads go to the history
+        history.state_at(time.time() - 3600)
+        history.changes(start, end)
+
+        :param path: str
+            File to keep the history in, default None (memory only)
+        """
+
+        self.path = path
+        self.times = array('d')
+        self.masks = array('H')
+        self._lock = threading.Lock()
+        self._file = None
+
+        if path is not None:
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = f.read()
+                # drop a sample cut by a crash
+                data = data[:len(data) - len(data) % _SAMPLE.size]
+                for at, mask in _SAMPLE.iter_unpack(data):
+                    self.times.append(at)
+                    self.masks.append(mask)
+
+            self._file = open(path, 'ab')
+            self._file.truncate(len(self.times) * _SAMPLE.size)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def record(self, mask: int, at: float = None) -> bool:
+        """
+        Add state sample, ignored if the state is the same as the last one
+
+        :param mask: int
+            16-bit relays mask
+        :param at: float
+            time.time() of the sample, default now
+        :return: bool
+            Sample was stored
+        """
+
+        at = time.time() if at is None else at
+
+        with self._lock:
+            if self.masks and self.masks[-1] == mask:
+                return False
+
+            # wall clock stepped back, keep samples sorted
+            if self.times and at < self.times[-1]:
+                at = self.times[-1]
+
+            self.times.append(at)
+            self.masks.append(mask)
+
+            if self._file is not None:
+                self._file.write(_SAMPLE.pack(at, mask))
+                self._file.flush()
+
+        return True
+
+    def state_at(self, at: float) -> RelayMask:
+        """
+        Relays state at time `at`
+
+        :param at: float
+            time.time() value
+        :return: RelayMask
+            None if nothing is known before `at`
+        """
+
+        index = bisect.bisect_right(self.times, at) - 1
+        return None if index < 0 else RelayMask(self.masks[index])
+
+    def changes(self, start: float = None, end: float = None, relay: int = None) -> list:
+        """
+        Relays switched within [start, end)
+
+        :param start: float
+            time.time() value, default the beginning
+        :param end: float
+            time.time() value, default now
+        :param relay: int
+            Only this relay, default all
+        :return: list
+            watcher.RelayChange for each switch, in order of time
+        """
+
+        first = 1 if start is None else max(1, bisect.bisect_left(self.times, start))
+        last = len(self.times) if end is None else bisect.bisect_left(self.times, end)
+
+        result = []
+        for index in range(first, last):
+            for change in diff(self.masks[index - 1], self.masks[index], self.times[index]):
+                if relay is None or change.relay == relay:
+                    result.append(change)
+
+        return result
+
+    def to_numpy(self, relays: bool = False) -> tuple:
+        """
+        Samples as NumPy arrays, numpy is imported here only
+
+        :param relays: bool
+            Return masks unpacked to (samples, 16) bool array, column n-1 is relay n
+        :return: tuple
+            (times float64, masks uint16 or bool matrix)
+        """
+
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("History.to_numpy requires numpy, pip install numpy") from None
+
+        with self._lock:
+            times = numpy.frombuffer(self.times, dtype=numpy.float64).copy()
+            masks = numpy.frombuffer(self.masks, dtype=numpy.uint16).copy()
+
+        if relays:
+            masks = (masks[:, None] >> numpy.arange(16, dtype=numpy.uint16) & 1).astype(bool)
+
+        return times, masks
+
+    def close(self):
+        """
+        Close the history file
+        """
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "History":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,196 @@
+import bisect
+import threading
+
+# Upper bounds of latency histogram buckets, seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+COUNTERS = {
+    'bytes_sent': "Bytes sent to device",
+    'bytes_received': "Bytes received from device",
+    'frames_sent': "Command frames sent",
+    'frames_received': "Answer frames received",
+    'broken_frames': "Answers with wrong checksum",
+    'errors': "Failed exchanges (connection errors and timeouts)",
+    'timeouts': "Exchanges failed by timeout",
+    'retries': "Retried exchanges",
+    'reconnects': "Connections re-established",
+    'auth_failures': "Failed authorisations",
+}
+
+
+class Hook:
+    """
+    Base for objects watching raw traffic of UsrR16, see UsrR16(hooks=[...]).
+    Methods are called under the connection lock, keep them fast.
+    """
+
+    def on_send(self, data: bytes):
+        """
+        Data is about to be sent
+
+        :param data: bytes
+        """
+
+    def on_recv(self, data: bytes):
+        """
+        Data has been received
+
+        :param data: bytes
+        """
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds: tuple = DEFAULT_BUCKETS):
+        """
+        Latency histogram with fixed buckets
+
+        :param bounds: tuple
+            Sorted upper bounds of buckets, seconds
+        """
+
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)    # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list:
+        """
+        (upper bound, count of values <= bound) pairs, last bound is inf
+        """
+
+        result, total = [], 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate quantile as the upper bound of the bucket it falls into
+
+        :param q: float
+            Quantile, 0-1
+        :return: float
+        """
+
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float('inf')
+
+
+class Metrics:
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Latency histograms and counters of one or many UsrR16 instances,
+        see UsrR16(metrics=...). Values are labeled by board "host:port".
+
+        metrics = Metrics()
+        r16 = UsrR16(host='192.168.0.99', metrics=metrics)
+        print(metrics.prometheus())
+
+        :param buckets: tuple
+            Upper bounds of latency buckets, seconds
+        """
+
+        self.buckets = tuple(buckets)
+        self.latency = {}   # (board, command) -> Histogram
+        self.counters = {name: {} for name in COUNTERS}
+        self._lock = threading.Lock()
+
+    def observe(self, board: str, command: str, seconds: float):
+        """
+        Add exchange latency
+
+        :param board: str
+            "host:port"
+        :param command: str
+            Command name, "batch" for many frames sent at once
+        :param seconds: float
+        """
+
+        with self._lock:
+            histogram = self.latency.get((board, command))
+            if histogram is None:
+                histogram = self.latency[(board, command)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, board: str, value: int = 1):
+        """
+        Increase counter
+
+        :param name: str
+            One of COUNTERS
+        :param board: str
+            "host:port"
+        :param value: int
+        """
+
+        with self._lock:
+            counter = self.counters[name]
+            counter[board] = counter.get(board, 0) + value
+
+    def snapshot(self) -> dict:
+        """
+        Copy of all values as plain dict, JSON serializable
+
+        :return: dict
+            {'counters': {name: {board: value}},
+             'latency': {board: {command: {'count', 'sum', 'p50', 'p99', 'buckets'}}}}
+        """
+
+        with self._lock:
+            latency = {}
+            for (board, command), histogram in self.latency.items():
+                latency.setdefault(board, {})[command] = {
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'p50': histogram.quantile(0.5),
+                    'p99': histogram.quantile(0.99),
+                    'buckets': {str(bound): total for bound, total in histogram.cumulative()},
+                }
+
+            return {
+                'counters': {name: dict(values) for name, values in self.counters.items()},
+                'latency': latency,
+            }
+
+    def prometheus(self, prefix: str = 'usrr16') -> str:
+        """
+        All values in Prometheus text exposition format
+
+        :param prefix: str
+            Metric names prefix
+        :return: str
+        """
+
+        lines = []
+
+        with self._lock:
+            name = f"{prefix}_request_duration_seconds"
+            lines.append(f"# HELP {name} Time from sending a command to receiving its answer")
+            lines.append(f"# TYPE {name} histogram")
+            for (board, command), histogram in sorted(self.latency.items()):
+                labels = f'board="{board}",command="{command}"'
+                for bound, total in histogram.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {total}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+            for counter, description in COUNTERS.items():
+                name = f"{prefix}_{counter}_total"
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} counter")
+                for board, value in sorted(self.counters[counter].items()):
+                    lines.append(f'{name}{{board="{board}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
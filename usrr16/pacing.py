@@ -0,0 +1,114 @@
+import threading
+import time
+
+
+class Pacer:
+    def __init__(self, rate: float = 10.0, min_rate: float = 1.0, max_rate: float = 500.0,
+                 increase: float = 2.0, decrease: float = 0.5,
+                 latency_factor: float = 4.0, latency_slack: float = 0.005):
+        """
+        Adaptive send rate of one board, see UsrR16(pacing=Pacer())
+
+        Additive increase, multiplicative decrease: each acknowledged frame
+        raises the rate by `increase` frames/s, a garbled or lost answer, an
+        error or an answer much slower than usual cuts it by `decrease` times.
+        The rate settles just under what the board handles and drops when it
+        gets busy, writes are spaced by 1 / rate per frame.
+
+        Share one Pacer between all clients of a board.
+
+        :param rate: float
+            Initial rate, frames per second, default 10 (a 100ms gap)
+        :param min_rate: float
+            Lowest rate, frames per second, default 1
+        :param max_rate: float
+            Highest rate, frames per second, default 500
+        :param increase: float
+            Rate growth per acknowledged frame, frames per second, default 2
+        :param decrease: float
+            Rate multiplier on failure or congestion, default 0.5
+        :param latency_factor: float
+            Answer slower than `baseline * latency_factor + latency_slack`
+            means congestion, default 4
+        :param latency_slack: float
+            Seconds, keeps jitter of fast links from looking like congestion, default 0.005
+        """
+
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.latency_slack = latency_slack
+        self.baseline = None    # usual answer latency, seconds
+        self.failures = 0
+        self.congestions = 0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def gap(self) -> float:
+        """
+        Current pause between frames, seconds
+        """
+
+        return 1.0 / self.rate
+
+    def wait(self, frames: int = 1):
+        """
+        Reserve the next write slot and sleep until it comes.
+        Slots are taken one by one, so clients sharing the Pacer don't write at once.
+
+        :param frames: int
+            Frames of the write, the next slot is `frames / rate` seconds later
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at)
+            self._next_at = at + frames / self.rate
+
+        if at > now:
+            time.sleep(at - now)
+
+    def sent(self, frames: int = 1):
+        """
+        Write of `frames` frames has just been sent, a write delayed after
+        its slot pushes the next slot back
+        """
+
+        with self._lock:
+            self._next_at = max(self._next_at, time.monotonic() + frames / self.rate)
+
+    def success(self, latency: float, frames: int = 1):
+        """
+        All answers of a write are received and valid
+
+        :param latency: float
+            Seconds from the write to the last answer
+        :param frames: int
+            Frames in the write
+        """
+
+        with self._lock:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                # follow slow drifts of the link, not spikes
+                self.baseline += (latency - self.baseline) * 0.01
+
+            if latency > self.baseline * self.latency_factor + self.latency_slack:
+                self.congestions += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase * frames)
+
+    def failure(self):
+        """
+        A write got a garbled or no answer, or failed
+        """
+
+        with self._lock:
+            self.failures += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Pulse:
+    def __init__(self, r16, relay: int, on: bool, duration: float, scheduler):
+        """
+        Relay switched for a while, switched back by a scheduler timer.
+        Use UsrR16.pulse to create
+
+        :param r16: UsrR16
+            Device the relay belongs to
+        :param relay: int
+            Relay's id
+        :param on: bool
+            State the relay was switched to
+        :param duration: float
+            Seconds before switching back
+        :param scheduler: Scheduler
+            Scheduler running the switch back
+        """
+
+        self.r16 = r16
+        self.relay = relay
+        self.on = on
+        self.error = None
+        self.ends_at = time.monotonic() + duration
+        self._scheduler = scheduler
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        with self._lock:
+            self._schedule()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(relay={self.relay}, on={self.on}, active={self.active})"
+
+    @property
+    def active(self) -> bool:
+        """
+        Relay is not switched back yet and pulse is not cancelled
+        """
+
+        return not self._done.is_set()
+
+    @property
+    def remaining(self) -> float:
+        """
+        Seconds left before switching back
+        """
+
+        return max(0.0, self.ends_at - time.monotonic()) if self.active else 0.0
+
+    def _schedule(self):
+        # called under self._lock, so the callback can't run before self._timer is set
+        timer = self._scheduler.call_at(self.ends_at, lambda: self._revert(timer))
+        self._timer = timer
+
+    def _revert(self, timer=None):
+        with self._lock:
+            if self._done.is_set():
+                return
+
+            # a timer which fired before extend() cancelled it, its callback
+            # was waiting for a free scheduler worker
+            if timer is not None and timer is not self._timer:
+                return
+
+            try:
+                if self.on:
+                    self.r16.turn_off(self.relay)
+                else:
+                    self.r16.turn_on(self.relay)
+            except Exception as e:
+                self.error = e
+                logger.warning("Switching back relay %d of %s failed, it stays %s: %r",
+                               self.relay, self.r16.host, 'on' if self.on else 'off', e)
+            finally:
+                self._done.set()
+
+    def cancel(self, revert: bool = False) -> bool:
+        """
+        Cancel switching back
+
+        :param revert: bool
+            Switch the relay back right now
+        :return: bool
+            False if the pulse has already ended
+        """
+
+        with self._lock:
+            if self._done.is_set():
+                return False
+
+            self._timer.cancel()
+            if not revert:
+                self._done.set()
+                return True
+
+        self._revert()
+        return True
+
+    def extend(self, seconds: float) -> bool:
+        """
+        Switch back later
+
+        :param seconds: float
+            Seconds to add to the pulse
+        :return: bool
+            False if the pulse has already ended
+        """
+
+        with self._lock:
+            if self._done.is_set():
+                return False
+
+            self._timer.cancel()
+            self.ends_at += seconds
+            self._schedule()
+            return True
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait for the pulse to end
+
+        :param timeout: float
+            Seconds to wait, default None (forever)
+        :return: bool
+            True if the pulse has ended
+        """
+
+        return self._done.wait(timeout)
@@ -0,0 +1,190 @@
+import logging
+import threading
+
+from usrr16.codec import encode, FrameError, STATE
+from usrr16.timers import default_scheduler
+from usrr16.usrr16 import RelayMask
+
+logger = logging.getLogger(__name__)
+
+
+class Reconciler:
+    def __init__(self, r16, interval: float = 5.0, debounce: float = 0.05, allow_glitch: bool = False,
+                 scheduler=None):
+        """
+        Keeps relays in the desired state: reads the real state by one request
+        and sends only the commands fixing the difference (see UsrR16.mask_commands).
+        Runs every `interval` seconds and shortly after the desired state changes,
+        all changes within `debounce` seconds cost one reconcile.
+
+        Only relays with a desired state are managed, others are left as they are.
+
+        reconciler = Reconciler(r16).start()
+        reconciler.set(3, True)
+        reconciler.set_mask(0b1000_0000_0000_0011)
+
+        :param r16: UsrR16
+            Device to keep in desired state
+        :param interval: float
+            Seconds between periodic reconciles, default 5.0
+        :param debounce: float
+            Seconds to collect desired state changes before reconciling, default 0.05
+        :param allow_glitch: bool
+            Allow plans which briefly switch relays that should stay as they are
+        :param scheduler: Scheduler
+            Timers scheduler, default r16.scheduler or timers.default_scheduler()
+        """
+
+        self.r16 = r16
+        self.interval = interval
+        self.debounce = debounce
+        self.allow_glitch = allow_glitch
+        self.desired = 0x0000
+        self.managed = 0x0000       # relays with desired state, bit n-1 is relay n
+        self.mask = None            # state after the last reconcile
+        self.corrections = 0        # reconciles which had to send commands
+        self.error = None
+        # Scheduler has __len__, an idle one is falsy
+        if scheduler is None:
+            scheduler = r16.scheduler if r16.scheduler is not None else default_scheduler()
+        self._scheduler = scheduler
+        self._lock = threading.Lock()   # one reconcile at a time
+        self._timers = threading.Lock()
+        self._soon = None
+        self._periodic = None
+        self._running = False
+
+    @property
+    def target(self) -> int:
+        """
+        Desired state of managed relays, unmanaged ones taken from the last known state
+        """
+
+        return (self.mask or 0) & ~self.managed & 0xFFFF | self.desired & self.managed
+
+    def set(self, relay: int, on: bool):
+        """
+        Desire relay on or off
+
+        :param relay: int
+            Relay's id, 1-16
+        :param on: bool
+        """
+
+        if not 1 <= relay <= 16:
+            raise ValueError(f"Relay's id should be 1-16, got {relay}")
+
+        bit = 1 << (relay - 1)
+        # desired first: a reconcile running meanwhile must not see
+        # the relay managed with a stale desired state
+        self.desired = self.desired | bit if on else self.desired & ~bit
+        self.managed |= bit
+        self._changed()
+
+    def set_mask(self, mask: int, managed: int = 0xFFFF):
+        """
+        Desire relays state
+
+        :param mask: int
+            16-bit relays mask, bit n-1 is relay n
+        :param managed: int
+            Relays the mask applies to, default all
+        """
+
+        managed &= 0xFFFF
+        self.desired = self.desired & ~managed | mask & managed
+        self.managed |= managed
+        self._changed()
+
+    def release(self, relay: int = 0):
+        """
+        Stop managing relay
+
+        :param relay: int
+            Relay's id, 0 - all
+        """
+
+        self.managed &= 0x0000 if relay == 0 else ~(1 << (relay - 1)) & 0xFFFF
+
+    def _changed(self):
+        with self._timers:
+            if self._running and self._soon is None:
+                self._soon = self._scheduler.call_later(self.debounce, self._run)
+
+    def reconcile(self) -> list:
+        """
+        Read real state and fix managed relays now
+
+        :return: list
+            (relay, command) pairs sent, empty if the board was in desired state
+        """
+
+        with self._lock:
+            current = self.r16.refresh()
+            managed, desired = self.managed, self.desired
+            target = current & ~managed & 0xFFFF | desired & managed
+
+            if current == target:
+                self.mask = current
+                return []
+
+            commands = self.r16.mask_commands(current, target, allow_glitch=self.allow_glitch)
+            logger.info("%s drifted from desired state: %s -> %s, sending %d commands",
+                        self.r16.host, RelayMask(current), RelayMask(target), len(commands))
+
+            answers = self.r16.send_batch([encode(relay, command) for relay, command in commands] + [encode(0, STATE)])
+            self.corrections += 1
+
+            if answers[-1] is None:
+                self.mask = None
+                raise FrameError("Broken answer on state request")
+
+            self.mask = RelayMask.from_reply(answers[-1])
+            return commands
+
+    def _run(self):
+        with self._timers:
+            self._soon = None
+
+        try:
+            self.reconcile()
+            self.error = None
+        except (OSError, ValueError) as e:
+            self.error = e
+            logger.warning("Reconcile of %s failed: %r", self.r16.host, e)
+
+        with self._timers:
+            if self._running:
+                if self._periodic is not None:
+                    self._periodic.cancel()
+                self._periodic = self._scheduler.call_later(self.interval, self._run)
+
+    def start(self) -> "Reconciler":
+        """
+        Start reconciling in background, first reconcile goes right away
+        """
+
+        with self._timers:
+            if not self._running:
+                self._running = True
+                self._soon = self._scheduler.call_later(0, self._run)
+
+        return self
+
+    def stop(self):
+        """
+        Stop reconciling, the reconcile in progress (if any) completes
+        """
+
+        with self._timers:
+            self._running = False
+            for timer in (self._soon, self._periodic):
+                if timer is not None:
+                    timer.cancel()
+            self._soon = self._periodic = None
+
+    def __enter__(self) -> "Reconciler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
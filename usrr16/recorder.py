@@ -0,0 +1,214 @@
+import socket
+import struct
+import threading
+import time
+from collections import namedtuple
+
+from usrr16.metrics import Hook
+
+MAGIC = b'R16W\x01'
+
+SENT = 0
+RECEIVED = 1
+
+# Record header: seconds since recording start (float64), direction, data length
+_HEADER = struct.Struct('<dBH')
+
+# One chunk of wire traffic
+#   time      - seconds since the recording start, monotonic clock
+#   direction - SENT (client to device) or RECEIVED
+Record = namedtuple('Record', ['time', 'direction', 'data'])
+
+# One replayed client write
+#   at       - offset of the write in the recording, seconds
+#   late     - how much later than planned the write was sent, seconds
+#   latency  - time from the write to the last expected byte of the answer, seconds
+#   match    - answer is byte-equal to the recorded one
+ReplayResult = namedtuple('ReplayResult', ['at', 'late', 'latency', 'match'])
+
+
+class Recorder(Hook):
+    def __init__(self, file):
+        """
+        Writes all traffic of UsrR16 to a compact binary log,
+        see read_log and replay
+
+        with Recorder('traffic.r16w') as recorder:
+            r16 = UsrR16(host='192.168.0.99', hooks=[recorder])
+            ...
+
+        Note: the log contains the password line sent on connect.
+
+        :param file: str or binary file object
+            Path or opened file to write the log to
+        """
+
+        if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+            self._file = open(file, 'wb')
+            self._owned = True
+        else:
+            self._file = file
+            self._owned = False
+
+        self._file.write(MAGIC)
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def _write(self, direction: int, data: bytes):
+        with self._lock:
+            self._file.write(_HEADER.pack(time.monotonic() - self._start, direction, len(data)))
+            self._file.write(data)
+            self.records += 1
+
+    def on_send(self, data: bytes):
+        self._write(SENT, data)
+
+    def on_recv(self, data: bytes):
+        self._write(RECEIVED, data)
+
+    def close(self):
+        """
+        Flush the log, close the file if it was opened by the recorder
+        """
+
+        with self._lock:
+            if self._owned:
+                self._file.close()
+            else:
+                self._file.flush()
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_log(file) -> list:
+    """
+    Read log written by Recorder
+
+    :param file: str or binary file object
+        Path or opened file
+    :return: list
+        Record for each recorded chunk
+    """
+
+    if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+        with open(file, 'rb') as f:
+            data = f.read()
+    else:
+        data = file.read()
+
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a USR-R16 traffic log")
+
+    records = []
+    view = memoryview(data)
+    offset = len(MAGIC)
+
+    while offset + _HEADER.size <= len(data):
+        at, direction, size = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        if offset + size > len(data):
+            break   # truncated by a crash, keep what is complete
+        records.append(Record(at, direction, view[offset:offset + size].tobytes()))
+        offset += size
+
+    return records
+
+
+def exchanges(records) -> list:
+    """
+    Pair each client write with the answer bytes received before the next write
+
+    :param records: iterable
+        Record objects
+    :return: list
+        (at, sent, expected answer) triples
+    """
+
+    result = []
+    for record in records:
+        if record.direction == SENT:
+            result.append((record.time, record.data, bytearray()))
+        elif result:
+            result[-1][2].extend(record.data)
+
+    return [(at, sent, bytes(answer)) for at, sent, answer in result]
+
+
+def replay(records, host: str, port: int = 8899, speed: float = 1.0, timeout: float = 5.0) -> list:
+    """
+    Send recorded client side to a device or simulator and measure its answers
+
+    Writes go at their recorded offsets divided by `speed`, each waits for as
+    many answer bytes as were recorded. Reconnects are replayed as writes on
+    the same connection, record one connection per log for exact reproduction.
+
+    with UsrR16Simulator(latency=0.005) as sim:
+        results = replay(read_log('traffic.r16w'), *sim.address, speed=None)
+
+    :param records: iterable
+        Record objects, see read_log
+    :param host: str
+    :param port: int
+    :param speed: float
+        Time scale, 2.0 - twice as fast, None - as fast as possible, default 1.0
+    :param timeout: float
+        Seconds to wait for each answer, default 5.0
+    :return: list
+        ReplayResult for each write
+    """
+
+    clock = time.monotonic
+    results = []
+    plan = exchanges(records)
+
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        start = clock()
+        first = plan[0][0] if plan else 0.0
+
+        for at, sent, expected in plan:
+            planned = 0.0 if speed is None else (at - first) / speed
+            delay = start + planned - clock()
+            if delay > 0:
+                time.sleep(delay)
+
+            sent_at = clock()
+            sock.sendall(sent)
+
+            answer = bytearray()
+            while len(answer) < len(expected):
+                chunk = sock.recv(256)
+                if not chunk:
+                    raise ConnectionError("Connection closed by device")
+                answer += chunk
+
+            latency = clock() - sent_at
+            late = 0.0 if speed is None else sent_at - start - planned
+            results.append(ReplayResult(at - first, late, latency, answer == expected))
+
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay USR-R16 traffic log')
+    parser.add_argument('log')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8899)
+    parser.add_argument('--speed', type=float, default=1.0, help='time scale, 0 - as fast as possible')
+    args = parser.parse_args()
+
+    results = replay(read_log(args.log), args.host, args.port, speed=args.speed or None)
+    latencies = sorted(result.latency for result in results)
+
+    if latencies:
+        print(f"writes: {len(results)}, mismatched answers: {sum(not result.match for result in results)}")
+        print(f"latency p50 {latencies[len(latencies) // 2] * 1000:.2f}ms, "
+              f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000:.2f}ms, "
+              f"max late {max(result.late for result in results) * 1000:.2f}ms")
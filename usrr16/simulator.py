@@ -0,0 +1,332 @@
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+
+class SimulatedBoard:
+    def __init__(self, password: str = "admin"):
+        """
+        State and protocol logic of a single USR-R16 board, without any I/O
+
+        :param password: str
+            Password expected by the board, default "admin"
+        """
+
+        self.password = password
+        self.mask = 0x0000
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def reply(command: int, payload: bytes) -> bytes:
+        """
+        Build answer frame
+        0xaa 0x55 <length> 0x00 <command | 0x80> <payload> <checksum>
+
+        :param command: int
+            Command id the answer is given for
+        :param payload: bytes
+            Answer data bytes
+        :return: bytes
+        """
+
+        body = bytes([0x00, command | 0x80]) + payload
+        head = len(body).to_bytes(2, 'big')
+
+        return b'\xaa\x55' + head + body + bytes([sum(head + body) & 0xFF])
+
+    def login(self, line: bytes) -> bytes:
+        """
+        Answer on password line
+
+        :param line: bytes
+            Password line without trailing b'\\r\\n'
+        :return: bytes
+            b'OK' if password is correct, b'ERROR' otherwise
+        """
+
+        return b'OK' if line == self.password.encode() else b'ERROR'
+
+    @staticmethod
+    def frames(buffer: bytearray):
+        """
+        Take complete request frames out of the received data,
+        an incomplete frame stays in the buffer
+
+        :param buffer: bytearray
+            Received data, consumed frames and garbage are removed
+        :return: iterator
+            Frames as bytes
+        """
+
+        # 0x55 0xaa frames, length is big-endian 2 bytes at [2:4]
+        while len(buffer) >= 4:
+            start = buffer.find(b'\x55\xaa')
+            if start < 0:
+                del buffer[:-1]
+                return
+            del buffer[:start]
+
+            size = 4 + int.from_bytes(buffer[2:4], 'big') + 1
+            if len(buffer) < size:
+                return
+
+            frame = bytes(buffer[:size])
+            del buffer[:size]
+            yield frame
+
+    def handle(self, frame: bytes) -> bytes:
+        """
+        Apply request frame to the board state and build the answer
+
+        :param frame: bytes
+            Request frame, 0x55 0xaa 0x00 0x03 0x00 <command> <relay> <checksum>
+        :return: bytes
+        """
+
+        command, relay = frame[5], frame[6]
+        bit = 0xFFFF if relay == 0 else 1 << (relay - 1) & 0xFFFF
+
+        with self.lock:
+            self.requests += 1
+
+            if command == 0x01:
+                self.mask &= ~bit
+            elif command == 0x02:
+                self.mask |= bit
+            elif command == 0x03:
+                self.mask ^= bit
+            elif command == 0x05:
+                self.mask = 0x0000
+            elif command == 0x0a:
+                return self.reply(command, bytes([self.mask & 0xFF, self.mask >> 8]))
+
+        return self.reply(command, bytes([relay]))
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.connections.add(self.request)
+        self.too_fast = False
+
+    def finish(self):
+        self.server.connections.discard(self.request)
+
+    def recv(self) -> bytes:
+        chunk = self.request.recv(1024)
+
+        # link latency: everything received at once is answered after one delay
+        if chunk and self.server.latency:
+            time.sleep(self.server.latency)
+
+        # overloaded board: a write coming too soon after the previous one is garbled
+        now = time.monotonic()
+        self.too_fast = now - self.server.last_write < self.server.min_gap
+        self.server.last_write = now
+
+        return chunk
+
+    def handle(self):
+        board = self.server.board
+        buffer = bytearray()
+
+        # Authorisation: password line, answered with b'OK'
+        while b'\r\n' not in buffer:
+            chunk = self.recv()
+            if not chunk:
+                return
+            buffer += chunk
+
+        line, _, rest = bytes(buffer).partition(b'\r\n')
+        answer = board.login(line)
+        self.request.sendall(answer)
+        if answer != b'OK':
+            return
+
+        # Commands
+        buffer = bytearray(rest)
+        while True:
+            answers = bytearray()
+            for frame in board.frames(buffer):
+                if self.too_fast:
+                    # not applied, answered with a broken checksum
+                    answer = bytearray(board.reply(frame[5], bytes([frame[6]])))
+                    answer[-1] ^= 0xFF
+                    answers += answer
+                    self.server.garbled += 1
+                else:
+                    answers += board.handle(frame)
+
+            if answers:
+                self.request.sendall(answers)
+
+            chunk = self.recv()
+            if not chunk:
+                return
+            buffer += chunk
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, board: SimulatedBoard, latency: float, min_gap: float = 0.0):
+        self.board = board
+        self.latency = latency
+        self.min_gap = min_gap
+        self.last_write = 0.0
+        self.garbled = 0
+        self.connections = set()
+        super().__init__(address, _Handler)
+
+    def handle_error(self, request, client_address):
+        # connections dropped by either side are normal here
+        if not isinstance(sys.exc_info()[1], OSError):
+            super().handle_error(request, client_address)
+
+
+class UsrR16Simulator:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, password: str = "admin", latency: float = 0.0,
+                 min_gap: float = 0.0):
+        """
+        Local TCP server emulating USR-R16 board, for tests and benchmarks
+
+        with UsrR16Simulator() as sim:
+            r16 = UsrR16(*sim.address)
+
+        :param host: str
+            Address to listen on, default "127.0.0.1"
+        :param port: int
+            Port to listen on, default 0 (any free port)
+        :param password: str
+            Password expected by the board, default "admin"
+        :param latency: float
+            Link delay in seconds before answering each received chunk, default 0.0
+        :param min_gap: float
+            Writes coming sooner than this many seconds after the previous one
+            are not applied and get broken answers, like on a busy board, default 0.0
+        """
+
+        self.board = SimulatedBoard(password=password)
+        self._server = _Server((host, port), self.board, latency, min_gap)
+        self._thread = None
+
+    @property
+    def address(self) -> tuple:
+        """
+        (host, port) the simulator is listening on
+        """
+
+        return self._server.server_address[:2]
+
+    @property
+    def mask(self) -> int:
+        """
+        Current 16-bit relays state of the board
+        """
+
+        return self.board.mask
+
+    @mask.setter
+    def mask(self, value: int):
+        with self.board.lock:
+            self.board.mask = value & 0xFFFF
+
+    @property
+    def latency(self) -> float:
+        """
+        Link delay in seconds before answering each received chunk
+        """
+
+        return self._server.latency
+
+    @latency.setter
+    def latency(self, value: float):
+        self._server.latency = value
+
+    @property
+    def min_gap(self) -> float:
+        """
+        Shortest pause between writes the board handles, seconds
+        """
+
+        return self._server.min_gap
+
+    @min_gap.setter
+    def min_gap(self, value: float):
+        self._server.min_gap = value
+
+    @property
+    def garbled(self) -> int:
+        """
+        Frames answered with broken checksum because they came too fast
+        """
+
+        return self._server.garbled
+
+    def start(self) -> "UsrR16Simulator":
+        """
+        Start serving in background thread
+        """
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+            self._thread.start()
+
+        return self
+
+    def drop_connections(self):
+        """
+        Close all client connections, the server keeps listening
+        """
+
+        for conn in list(self._server.connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stop(self):
+        """
+        Stop serving and drop all connections
+        """
+
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self.drop_connections()
+        self._server.server_close()
+
+    def __enter__(self) -> "UsrR16Simulator":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='USR-R16 board simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8899)
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--latency', type=float, default=0.0, help='answer delay in seconds')
+    parser.add_argument('--min-gap', type=float, default=0.0, help='writes closer than this are garbled, seconds')
+    args = parser.parse_args()
+
+    simulator = UsrR16Simulator(host=args.host, port=args.port, password=args.password, latency=args.latency,
+                                min_gap=args.min_gap)
+    print(f"USR-R16 simulator listening on {args.host}:{simulator.address[1]}")
+
+    try:
+        simulator._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator._server.server_close()
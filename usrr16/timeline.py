@@ -0,0 +1,123 @@
+import time
+from collections import namedtuple
+
+from usrr16.codec import OFF, ON, INVERT, OFF_ALL
+
+# Result of one timeline step
+#   at      - planned offset from the start, seconds
+#   late    - how much later than planned the step was sent, seconds
+#   ok      - device acknowledged the command
+StepResult = namedtuple('StepResult', ['at', 'relay', 'command', 'late', 'ok'])
+
+
+class Timeline:
+    def __init__(self, steps=None, tick: float = 0.002):
+        """
+        Relay actions planned at fixed offsets from the start
+
+        Steps are sent on time by monotonic clock, independently of how long
+        the previous ones took, steps due within one tick go by one write.
+
+        timeline = Timeline()
+        for i in range(16):
+            timeline.invert(i * 0.1, i + 1)
+        results = timeline.run(r16)
+
+        :param steps: iterable
+            (at, relay, command) triples, at - offset in seconds from the start
+        :param tick: float
+            Steps due within this many seconds are sent together, default 0.002
+        """
+
+        self.tick = tick
+        self.steps = []
+
+        for at, relay, command in steps or ():
+            self.add(at, relay, command)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    @property
+    def duration(self) -> float:
+        """
+        Offset of the last step
+        """
+
+        return max((at for at, _, _ in self.steps), default=0.0)
+
+    def add(self, at: float, relay: int, command: int) -> "Timeline":
+        """
+        Plan a command
+
+        :param at: float
+            Offset in seconds from the start
+        :param relay: int
+            Relay's id, 0 - all
+        :param command: int
+            1 - off, 2 - on, 3 - invert, 5 - all off
+        """
+
+        if at < 0:
+            raise ValueError(f"Step offset can't be negative, got {at}")
+
+        self.steps.append((at, relay, command))
+        return self
+
+    def turn_on(self, at: float, relay: int) -> "Timeline":
+        return self.add(at, relay, ON)
+
+    def turn_off(self, at: float, relay: int) -> "Timeline":
+        return self.add(at, relay, OFF)
+
+    def invert(self, at: float, relay: int) -> "Timeline":
+        return self.add(at, relay, INVERT)
+
+    def turn_off_all(self, at: float) -> "Timeline":
+        return self.add(at, 0, OFF_ALL)
+
+    def batches(self) -> list:
+        """
+        Group steps sent together
+
+        :return: list
+            (at, [(relay, command), ...]) pairs, sorted by time
+        """
+
+        batches = []
+
+        # stable sort, steps planned at the same time keep their order
+        for at, relay, command in sorted(self.steps, key=lambda step: step[0]):
+            if batches and at - batches[-1][0] <= self.tick:
+                batches[-1][1].append((relay, command))
+            else:
+                batches.append((at, [(relay, command)]))
+
+        return batches
+
+    def run(self, r16, start: float = None) -> list:
+        """
+        Execute timeline, blocks until the last step is sent
+
+        :param r16: UsrR16
+            Device to send commands to
+        :param start: float
+            time.monotonic() value the offsets count from, default now
+        :return: list
+            StepResult for each step, in order of sending
+        """
+
+        clock = time.monotonic
+        start = clock() if start is None else start
+        results = []
+
+        for at, commands in self.batches():
+            delay = start + at - clock()
+            if delay > 0:
+                time.sleep(delay)
+
+            late = clock() - start - at
+            for (relay, command), ok in zip(commands, r16.pipeline(commands)):
+                results.append(StepResult(at, relay, command, late, ok))
+
+        return results
@@ -0,0 +1,133 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class Timer:
+    __slots__ = ('when', 'callback', 'cancelled')
+
+    def __init__(self, when: float, callback):
+        """
+        Callback planned by Scheduler, use Scheduler.call_at to create
+
+        :param when: float
+            time.monotonic() value to run at
+        :param callback: callable
+            Called without arguments
+        """
+
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Don't run the callback, no-op if it has run already
+        """
+
+        self.cancelled = True
+
+
+class Scheduler:
+    def __init__(self, workers: int = 4):
+        """
+        One background thread running callbacks at planned times,
+        shared by all timers instead of a thread or a sleep per timer
+
+        Callbacks run in a small thread pool, so a slow one (e.g. a command
+        to an unreachable board) doesn't delay the others.
+
+        :param workers: int
+            Threads running callbacks, default 4
+        """
+
+        self.workers = workers
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pool = None
+
+    def call_at(self, when: float, callback) -> Timer:
+        """
+        Run callback at time.monotonic() value `when`
+
+        :param when: float
+        :param callback: callable
+        :return: Timer
+        """
+
+        timer = Timer(when, callback)
+
+        with self._cond:
+            if self._thread is None:
+                from concurrent.futures import ThreadPoolExecutor  # imported on first timer, keeps import fast
+
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='usrr16-timer')
+                self._thread = threading.Thread(target=self._run, name='usrr16-scheduler', daemon=True)
+                self._thread.start()
+
+            heapq.heappush(self._heap, (when, next(self._seq), timer))
+            # wake the thread if the new timer is the nearest one
+            if self._heap[0][2] is timer:
+                self._cond.notify()
+
+        return timer
+
+    def call_later(self, delay: float, callback) -> Timer:
+        """
+        Run callback in `delay` seconds
+
+        :param delay: float
+        :param callback: callable
+        :return: Timer
+        """
+
+        return self.call_at(time.monotonic() + delay, callback)
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(1 for _, _, timer in self._heap if not timer.cancelled)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+
+                    when, _, timer = self._heap[0]
+                    if timer.cancelled:
+                        heapq.heappop(self._heap)
+                        continue
+
+                    delay = when - time.monotonic()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+
+                    heapq.heappop(self._heap)
+                    # run once, cancel() after this point is a no-op
+                    timer.cancelled = True
+                    break
+
+            self._pool.submit(timer.callback)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> Scheduler:
+    """
+    Scheduler shared by all UsrR16 instances
+    """
+
+    global _default
+
+    with _default_lock:
+        if _default is None:
+            _default = Scheduler()
+        return _default
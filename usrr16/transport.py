@@ -0,0 +1,195 @@
+"""
+Ways to reach a board, see UsrR16(transport=...)
+
+A transport opens connections: objects with the part of socket interface
+used by UsrR16 (settimeout, send, sendall, recv, recv_into, close).
+TCP connections are plain sockets, so the default path costs nothing extra.
+"""
+
+import socket
+
+
+class TcpTransport:
+    # password line is expected after connect
+    login = True
+
+    def __init__(self, host: str, port: int = 8899):
+        """
+        TCP connection to USR-R16, the default transport
+
+        :param host: str
+            IP address of host as string, example: "192.168.0.42"
+        :param port: int
+            Default 8899
+        """
+
+        self.host = host
+        self.port = port
+
+    def __str__(self):
+        return f"{self.host}:{self.port}"
+
+    def connect(self, timeout: float = None) -> socket.socket:
+        """
+        Open connection
+
+        :param timeout: float
+            Seconds for connect, default None (no timeout)
+        """
+
+        return socket.create_connection((self.host, self.port), timeout=timeout)
+
+
+class SerialTransport:
+    def __init__(self, port: str, baudrate: int = 9600, login: bool = False, **options):
+        """
+        USR-R16-T over RS-485 / serial port without TCP converter, requires pyserial
+
+        r16 = UsrR16(transport=SerialTransport('/dev/ttyUSB0'))
+
+        :param port: str
+            Serial port, e.g. "/dev/ttyUSB0" or "COM3"
+        :param baudrate: int
+            Default 9600
+        :param login: bool
+            Board expects password line first, default False
+        :param options:
+            More serial.Serial arguments (bytesize, parity, stopbits...)
+        """
+
+        self.port = port
+        self.baudrate = baudrate
+        self.login = login
+        self.options = options
+
+    def __str__(self):
+        return self.port
+
+    def connect(self, timeout: float = None) -> "_SerialConnection":
+        try:
+            import serial
+        except ImportError:
+            raise ImportError("SerialTransport requires pyserial, pip install usrr16[serial]") from None
+
+        return _SerialConnection(serial.Serial(self.port, self.baudrate, timeout=timeout, **self.options))
+
+
+class _SerialConnection:
+    def __init__(self, port):
+        self.port = port
+
+    def settimeout(self, timeout: float):
+        self.port.timeout = timeout
+
+    def sendall(self, data: bytes):
+        self.port.write(data)
+
+    def send(self, data: bytes) -> int:
+        return self.port.write(data)
+
+    def recv_into(self, buffer, nbytes: int = 0) -> int:
+        nbytes = nbytes or len(buffer)
+
+        # wait for the first byte, then take what has arrived
+        data = self.port.read(1)
+        if not data:
+            raise socket.timeout(f"No answer on {self.port.port} in time")
+
+        waiting = min(self.port.in_waiting, nbytes - 1)
+        if waiting:
+            data += self.port.read(waiting)
+
+        buffer[:len(data)] = data
+        return len(data)
+
+    def recv(self, bufsize: int) -> bytes:
+        buffer = bytearray(bufsize)
+        return bytes(buffer[:self.recv_into(buffer, bufsize)])
+
+    def close(self):
+        self.port.close()
+
+
+class LoopbackTransport:
+    login = True
+
+    def __init__(self, board: "SimulatedBoard" = None):
+        """
+        In-memory board, no network and no threads: writes are answered at once.
+        For tests, and for measuring client overhead without network cost.
+
+        transport = LoopbackTransport()
+        r16 = UsrR16(transport=transport)
+        transport.board.mask
+
+        :param board: SimulatedBoard
+            Board state and logic, default a new SimulatedBoard()
+        """
+
+        from usrr16.simulator import SimulatedBoard  # server modules are not needed otherwise
+
+        self.board = board if board is not None else SimulatedBoard()
+
+    def __str__(self):
+        return "loopback"
+
+    def connect(self, timeout: float = None) -> "_LoopbackConnection":
+        return _LoopbackConnection(self.board)
+
+
+class _LoopbackConnection:
+    def __init__(self, board):
+        self.board = board
+        self._received = bytearray()
+        self._answers = bytearray()
+        self._authorized = False
+        self._closed = False
+
+    def settimeout(self, timeout: float):
+        pass
+
+    def sendall(self, data: bytes):
+        if self._closed:
+            raise ConnectionError("Loopback connection is closed")
+
+        self._received += data
+
+        if not self._authorized:
+            if b'\r\n' not in self._received:
+                return
+
+            line, _, rest = bytes(self._received).partition(b'\r\n')
+            answer = self.board.login(line)
+            self._answers += answer
+            if answer != b'OK':
+                self._closed = True
+                return
+
+            self._authorized = True
+            self._received = bytearray(rest)
+
+        for frame in self.board.frames(self._received):
+            self._answers += self.board.handle(frame)
+
+    def send(self, data: bytes) -> int:
+        self.sendall(data)
+        return len(data)
+
+    def recv_into(self, buffer, nbytes: int = 0) -> int:
+        if not self._answers:
+            if self._closed:
+                return 0
+            raise socket.timeout("No answer from loopback board")
+
+        size = min(nbytes or len(buffer), len(self._answers))
+        buffer[:size] = self._answers[:size]
+        del self._answers[:size]
+        return size
+
+    def recv(self, bufsize: int) -> bytes:
+        buffer = bytearray(bufsize)
+        return bytes(buffer[:self.recv_into(buffer, bufsize)])
+
+    def close(self):
+        self._closed = True
+        self._answers.clear()
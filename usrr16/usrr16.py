@@ -1,25 +1,261 @@
 import socket
+import threading
+import time
+
+from usrr16.codec import FrameDecoder, FrameError, encode, COMMAND_NAMES, OFF, ON, INVERT, OFF_ALL, STATE
+from usrr16.pulse import Pulse
+from usrr16.timers import default_scheduler
+from usrr16.watcher import Watcher
+
+# Commands safe to send again if the answer was lost
+IDEMPOTENT = frozenset((OFF, ON, OFF_ALL, STATE))
+
+
+class RelayMask(int):
+    """
+    Snapshot of all 16 relays as one 16-bit integer
+
+    Bit ``n - 1`` is set when relay ``n`` is turned on, so relays 1-8 live in
+    the low byte and relays 9-16 in the high byte, exactly as the device
+    reports them.
+
+    >>> mask = RelayMask(0b101)
+    >>> mask[1], mask[2], mask[3]
+    (True, False, True)
+    """
+
+    def __new__(cls, value: int = 0):
+        if value < 0 or value > 0xFFFF:
+            raise ValueError(f"Relay mask out of range, expected 0x0000-0xFFFF, got {value!r}")
+
+        return super().__new__(cls, value)
+
+    @classmethod
+    def from_reply(cls, resp: bytes) -> "RelayMask":
+        """
+        Build mask from the device reply on state request (command 0x0a)
+
+        :param resp: bytes
+            Raw reply, b'\\xaa\\x55\\x00\\x04\\x00\\x81\\x08\\x00\\x8d'
+        :return: RelayMask
+        :raises FrameError: frame is not a state reply (4 data bytes), e.g. a command acknowledgement
+        """
+
+        if len(resp) != 9 or resp[2] != 0x00 or resp[3] != 0x04:
+            raise FrameError(f"Not a state reply: {bytes(resp).hex(' ')}")
+
+        return cls(resp[6] | resp[7] << 8)
+
+    def __getitem__(self, relay: int) -> bool:
+        """
+        Is relay turned on
+
+        :param relay: int
+            Relay's id, 1-16
+        :return: bool
+        """
+
+        if relay < 1 or relay > 16:
+            raise ValueError(f"Relay value out of range, expected 1-16, got {relay}")
+
+        return self >> (relay - 1) & 1 == 1
+
+    def __iter__(self):
+        """
+        Iterate over states of relays 1-16
+        """
+
+        return (self >> i & 1 == 1 for i in range(16))
+
+    def enabled(self) -> list:
+        """
+        Get ids of turned on relays
+
+        :return: list
+            Relays ids, example: [1, 5, 16]
+        """
+
+        return [i + 1 for i in range(16) if self >> i & 1]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(0b{int(self):016b})"
+
+
+class _Flight:
+    """
+    State request in progress, shared by all readers which came while it was sent
+    """
+
+    __slots__ = ('done', 'mask', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.mask = None
+        self.error = None
+
+    def result(self) -> "RelayMask":
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.mask
 
 
 class UsrR16:
-    def __init__(self, host: str, port: int = 8899, password: str = "admin"):
+    def __init__(self, host: str = None, port: int = 8899, password: str = "admin", cache_ttl: float = None,
+                 timeout: float = None, connect_timeout: float = None, retries: int = 0,
+                 backoff: float = 0.1, keepalive: float = None, metrics=None, hooks: list = None,
+                 pacing=None, history=None, transport=None):
         """
         Main class to interact with USR-R16 Relay
 
         :param host: str
-            IP address of host as string, example: "192.168.0.42"
+            IP address of host as string, example: "192.168.0.42", not needed with transport
         :param port: int
             Port for connection if custom, default value 8899
         :param password: str
             Password to login on device, default "admin"
+        :param cache_ttl: float
+            Seconds a read relays state is served from cache, default None (no cache).
+            Acknowledged commands are applied to the cached state.
+        :param timeout: float
+            Deadline in seconds for each operation (send and all answers), default None (no timeout)
+        :param connect_timeout: float
+            Timeout in seconds for connect and login, default None (no timeout)
+        :param retries: int
+            Retries of idempotent commands (all but invert) after connection errors,
+            timeouts or broken answers, with reconnect if needed. Default 0
+        :param backoff: float
+            Delay before the first retry in seconds, doubled for each next one, default 0.1
+        :param keepalive: float
+            Send state request if connection was idle for this many seconds,
+            default None (no keepalive)
+        :param metrics: Metrics
+            Collect latency histograms and counters into it, default None (disabled)
+        :param hooks: list
+            metrics.Hook objects called with all sent and received data, default None
+        :param pacing: Pacer
+            Space writes by an adaptive rate (pacing.Pacer), for boards which garble
+            commands coming too fast, default None (no pauses)
+        :param history: History
+            Keep relays state read from device in history.History, default None
+        :param transport: TcpTransport, SerialTransport or LoopbackTransport
+            How to reach the board (see usrr16.transport), default TCP to host:port
         """
 
-        self.host = host
+        if transport is None:
+            if host is None:
+                raise ValueError("Either host or transport is required")
+
+            from usrr16.transport import TcpTransport
+            transport = TcpTransport(host, port)
+
+        self.transport = transport
+        self.host = host if host is not None else str(transport)
         self.port = port
-        self.sock = socket.socket()
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.keepalive = keepalive
+        self.metrics = metrics
+        self.hooks = list(hooks or ())
+        self.pacing = pacing
+        self.history = history
+        self.board = str(transport)
+        self.scheduler = None
+        self.sock = None
+        self._password = password
+        self._decoder = FrameDecoder()
+        self._cached = None
+        self._cached_at = 0.0
+        self._lock = threading.RLock()
+        self._broken = True
+        self._last_io = time.monotonic()
+        self._closed = threading.Event()
+        self._pulses = {}
+        self._watcher = None
+        self._watcher_lock = threading.Lock()
+        self._connects = 0
+        self._flight = None
+        self._flight_lock = threading.Lock()
+
+        self.connect()
+
+        if keepalive:
+            threading.Thread(target=self._keepalive_loop, name=f"usrr16-keepalive-{self.host}", daemon=True).start()
+
+    def connect(self):
+        """
+        (Re)connect and authorise on device
+        """
+
+        with self._lock:
+            self._drop()
+            self.sock = self.transport.connect(self.connect_timeout)
+            self._decoder.clear()
+            if self.transport.login:
+                # login is a part of connect, a silent host must not hang it
+                self.sock.settimeout(self.connect_timeout)
+                self.auth(password=self._password)
+            self.sock.settimeout(self.timeout)
+            self._broken = False
+            self._last_io = time.monotonic()
+
+            if self._connects and self.metrics is not None:
+                self.metrics.inc('reconnects', self.board)
+            self._connects += 1
+
+    def _drop(self):
+        self._broken = True
+        if self.sock is not None:
+            self.sock.close()
+
+    def close(self):
+        """
+        Stop keepalive and close connection, later commands raise ConnectionError
+        """
 
-        self.sock.connect((host, port))
-        self.auth(password=password)
+        self._closed.set()
+
+        # a poll waiting for the board fails at once instead of blocking the join below
+        sock = self.sock
+        if sock is not None and hasattr(sock, 'shutdown'):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        if self._watcher is not None:
+            self._watcher.stop()
+
+        with self._lock:
+            self._drop()
+
+    def __enter__(self) -> "UsrR16":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _keepalive_loop(self):
+        while not self._closed.wait(self.keepalive / 2):
+            if time.monotonic() - self._last_io < self.keepalive:
+                continue
+
+            # busy connection is not idle, skip this round
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if self._broken:
+                    self.connect()
+                else:
+                    self.refresh()
+            except (OSError, ValueError):
+                # FrameError is ValueError, the next round reconnects or reads again
+                pass
+            finally:
+                self._lock.release()
 
     def send_recv(self, data: bytes, bufsize: int = 256) -> bytes:
         """
@@ -32,8 +268,263 @@ class UsrR16:
         :return:
         """
 
-        self.sock.send(data)
-        return self.sock.recv(bufsize)
+        with self._lock:
+            for hook in self.hooks:
+                hook.on_send(data)
+
+            self.sock.send(data)
+            answer = self.sock.recv(bufsize)
+
+            for hook in self.hooks:
+                hook.on_recv(answer)
+
+            if self.metrics is not None:
+                self.metrics.inc('bytes_sent', self.board, len(data))
+                self.metrics.inc('bytes_received', self.board, len(answer))
+
+            return answer
+
+    def recv_frames(self, count: int, bufsize: int = 256, deadline: float = None) -> list:
+        """
+        Receive `count` answer frames, answers split or merged by TCP are
+        put back together by length from the frame header
+        0xaa 0x55 <length 2 bytes> <length bytes> <checksum>
+
+        :param count: int
+            Number of frames to receive
+        :param bufsize: int
+            Buffer size for sock.recv_into
+        :param deadline: float
+            time.monotonic() value to receive all frames before, default None (no deadline)
+        :return: list
+            Frames as bytes, None for frames with wrong checksum
+        """
+
+        frames = []
+        decoder = self._decoder
+
+        while len(frames) < count:
+            try:
+                frame = decoder.next_frame()
+            except FrameError:
+                if self.metrics is not None:
+                    self.metrics.inc('broken_frames', self.board)
+                frames.append(None)
+                continue
+
+            if frame is not None:
+                frames.append(frame)
+                continue
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout(f"No answer from {self.board} in time")
+                self.sock.settimeout(remaining)
+
+            view = decoder.writable(bufsize)
+            size = self.sock.recv_into(view, bufsize)
+            if not size:
+                raise ConnectionError("Connection closed by device")
+            decoder.commit(size)
+
+            if self.hooks:
+                data = view[:size].tobytes()
+                for hook in self.hooks:
+                    hook.on_recv(data)
+
+            if self.metrics is not None:
+                self.metrics.inc('bytes_received', self.board, size)
+
+        return frames
+
+    def _exchange(self, frames: list) -> list:
+        # send frames by one write and receive answers, retry idempotent ones
+        retryable = self.retries and all(frame[5] in IDEMPOTENT for frame in frames)
+        attempt = 0
+        data = b''.join(frames)
+        metrics = self.metrics
+        pacing = self.pacing
+
+        with self._lock:
+            while True:
+                # don't open a new session nobody would close
+                if self._closed.is_set():
+                    raise ConnectionError(f"Connection to {self.board} is closed")
+
+                try:
+                    if self._broken:
+                        self.connect()
+
+                    if pacing is not None:
+                        pacing.wait(len(frames))
+
+                    # after the pacing pause, so recorded write times are the real ones
+                    for hook in self.hooks:
+                        hook.on_send(data)
+
+                    started = time.monotonic()
+                    deadline = None if self.timeout is None else started + self.timeout
+                    self.sock.sendall(data)
+
+                    if pacing is not None:
+                        pacing.sent(len(frames))
+
+                    if metrics is not None:
+                        metrics.inc('bytes_sent', self.board, len(data))
+                        metrics.inc('frames_sent', self.board, len(frames))
+
+                    answers = self.recv_frames(len(frames), deadline=deadline)
+                    self._last_io = time.monotonic()
+
+                    if metrics is not None:
+                        command = COMMAND_NAMES.get(frames[0][5], 'other') if len(frames) == 1 else 'batch'
+                        metrics.observe(self.board, command, self._last_io - started)
+                        metrics.inc('frames_received', self.board, len(answers))
+
+                    if pacing is not None:
+                        if None in answers:
+                            pacing.failure()
+                        else:
+                            pacing.success(self._last_io - started, len(frames))
+
+                    # applied under the lock, so answers reach the cache in wire order
+                    if self.cache_ttl is not None:
+                        for frame, answer in zip(frames, answers):
+                            self._update_cache(frame[6], frame[5], answer)
+
+                    if None not in answers or not retryable or attempt >= self.retries:
+                        return answers
+
+                except OSError as e:
+                    if pacing is not None:
+                        pacing.failure()
+
+                    if metrics is not None:
+                        metrics.inc('errors', self.board)
+                        if isinstance(e, socket.timeout):
+                            metrics.inc('timeouts', self.board)
+
+                    # connection state is unknown after an error, a late answer would be
+                    # taken as an answer on the next request, so it is dropped.
+                    # Commands may have been applied by device, so is the cached state
+                    self._drop()
+                    self.invalidate()
+                    if not retryable or attempt >= self.retries:
+                        raise
+
+                except BaseException:
+                    # raising hook, interrupt: unread answers would be taken
+                    # as answers on the next request, same as after an error
+                    self._drop()
+                    self.invalidate()
+                    raise
+
+                if metrics is not None:
+                    metrics.inc('retries', self.board)
+
+                time.sleep(self.backoff * 2 ** attempt)
+                attempt += 1
+
+    def request(self, relay: int, command: int) -> bytes:
+        """
+        Send command and receive its answer frame
+
+        :param relay: int
+            Relay's id, 0 - all
+        :param command: int
+            1 - off, 2 - on, 3 - invert, 5 - all off, 0x0a - state
+        :return: bytes
+            Answer frame
+        """
+
+        frame = self._exchange([encode(relay, command)])[0]
+
+        if frame is None:
+            raise FrameError(f"Broken answer on command {command:#04x} for relay {relay}")
+
+        return frame
+
+    def send_batch(self, frames: list) -> list:
+        """
+        Send many frames by one write and receive an answer for each of them
+
+        :param frames: list
+            Frames from req_gen
+        :return: list
+            Answer frames as bytes, in order of requests, None for broken answers
+        """
+
+        return self._exchange(frames)
+
+    def _update_cache(self, relay: int, command: int, answer: bytes):
+        if answer is None:
+            # broken answer, the command may have been applied or not
+            self.invalidate()
+            return
+
+        if command == STATE:
+            try:
+                self._cached = RelayMask.from_reply(answer)
+            except FrameError:
+                self.invalidate()
+                return
+            self._cached_at = time.monotonic()
+            return
+
+        bit = 0xFFFF if relay == 0 else 1 << (relay - 1)
+
+        # state of the whole board is known after these ones
+        if command == OFF_ALL or command == OFF and relay == 0:
+            self._cached, self._cached_at = RelayMask(0x0000), time.monotonic()
+        elif command == ON and relay == 0:
+            self._cached, self._cached_at = RelayMask(0xFFFF), time.monotonic()
+        elif self._cached is None:
+            return
+        elif command == ON:
+            self._cached = RelayMask(self._cached | bit)
+        elif command == OFF:
+            self._cached = RelayMask(self._cached & ~bit)
+        elif command == INVERT:
+            self._cached = RelayMask(self._cached ^ bit)
+        else:
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        Drop cached relays state, next state request goes to device
+        """
+
+        self._cached = None
+
+    def refresh(self) -> RelayMask:
+        """
+        Read relays state from device, bypassing and updating cache
+
+        :return: RelayMask
+        """
+
+        mask = RelayMask.from_reply(self.request(relay=0, command=STATE))
+
+        if self.history is not None:
+            self.history.record(mask)
+
+        return mask
+
+    def pipeline(self, commands) -> list:
+        """
+        Send many commands at once without waiting for answers in between
+
+        r16.pipeline([(1, 2), (2, 2), (3, 3)])  # on 1, on 2, invert 3
+
+        :param commands: iterable
+            (relay, command) pairs, command: 1 - off, 2 - on, 3 - invert, 5 - all off
+        :return: list
+            Success of each command, answer checksum is valid
+        """
+
+        answers = self.send_batch([encode(relay, command) for relay, command in commands])
+        return [answer is not None for answer in answers]
 
     def auth(self, password: str):
         """
@@ -49,25 +540,151 @@ class UsrR16:
         )
 
         if answer != b'OK':
+            if self.metrics is not None:
+                self.metrics.inc('auth_failures', self.board)
             raise ConnectionError("Authorisation failed | Password incorrect")
 
     @staticmethod
-    def req_gen(relay: int, command: int) -> bytearray:
+    def req_gen(relay: int, command: int) -> bytes:
         """
         Generate byte-command
         0x55 0xaa 0x00 %s 0x00 %s %s %s
 
+        Frames of known commands are taken from prebuilt codec.FRAMES
+
         :param relay: Relay number 0-16 (0 - all)
         :param command: 1 - off, 2 - on, 3 - invert
-        :return: bytearray
+        :return: bytes
         """
 
-        if relay < 0 or relay > 16:
-            raise ValueError(f"Relay value out of range, expected 1-16, got {relay}")
+        return encode(relay, command)
+
+    def state_all(self, max_age: float = None) -> RelayMask:
+        """
+        Get states of all relays by one request
+
+        If cache is enabled (cache_ttl) and the cached state is fresh enough,
+        it is returned without a request. Concurrent calls share one request.
+
+        :param max_age: float
+            Max age of the cached state in seconds, default cache_ttl
+        :return: RelayMask
+            16-bit mask, bit n-1 is set if relay n is turned on
+        """
+
+        if self.cache_ttl is not None and self._cached is not None:
+            if time.monotonic() - self._cached_at <= (self.cache_ttl if max_age is None else max_age):
+                return self._cached
+
+        # About resp
+        # 6th byte of the message holds relays 1-8, 7th byte holds relays 9-16
+        # b'\xaa\x55\x00\x04\x00\x81\x08\x00\x8d'
+        #                            ^    ^
+
+        # single flight: readers coming while a state request is in progress
+        # take its answer instead of sending their own
+        with self._flight_lock:
+            flight = self._flight
+            if flight is not None:
+                leader = False
+            else:
+                leader, flight = True, _Flight()
+                self._flight = flight
+
+        if not leader:
+            return flight.result()
+
+        try:
+            # the flight ends before the connection is released: a command completed
+            # after its request must not be followed by joining it
+            with self._lock:
+                try:
+                    flight.mask = self.refresh()
+                finally:
+                    with self._flight_lock:
+                        self._flight = None
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            flight.done.set()
+
+        return flight.mask
+
+    @staticmethod
+    def mask_commands(current: int, target: int, allow_glitch: bool = False) -> list:
+        """
+        Plan the fewest commands turning relays from `current` to `target` state
+
+        Besides per-relay on/off, whole board commands (all off, all on, invert all)
+        followed by per-relay fixes are considered. They are used only if no relay
+        which is the same in both states would be switched back and forth,
+        unless `allow_glitch` is set.
+
+        :param current: int
+            Current 16-bit relays mask
+        :param target: int
+            Wanted 16-bit relays mask
+        :param allow_glitch: bool
+            Allow plans which briefly switch relays that should stay as they are
+        :return: list
+            (relay, command) pairs
+        """
+
+        current &= 0xFFFF
+        target &= 0xFFFF
+        diff = current ^ target
+
+        def each(bits: int, command: int) -> list:
+            return [(i + 1, command) for i in range(16) if bits >> i & 1]
+
+        plans = [each(diff & target, ON) + each(diff & current, OFF)]
+
+        # all off, then on: relays on in both states would blink
+        if allow_glitch or not current & target:
+            plans.append([(0, OFF_ALL)] + each(target, ON))
+
+        # all on, then off: relays off in both states would blink
+        if allow_glitch or not ~current & ~target & 0xFFFF:
+            plans.append([(0, ON)] + each(~target & 0xFFFF, OFF))
+
+        # invert all, then invert back relays which should stay as they are
+        if allow_glitch or diff == 0xFFFF:
+            plans.append([(0, INVERT)] + each(~diff & 0xFFFF, INVERT))
 
-        return bytearray([0x55, 0xAA, 0x00, 3, 0x00, command, relay, 3])
+        return min(plans, key=len)
 
-    def state(self, relay: int) -> bool:
+    def set_mask(self, target: int, allow_glitch: bool = False) -> RelayMask:
+        """
+        Switch all relays to `target` state sending only needed commands
+
+        Current state is read from device by one request, bypassing cache,
+        commands and the final state request are sent by one write (see pipeline)
+
+        r16.set_mask(0b1000_0000_0000_0011)  # 1, 2 and 16 on, others off
+
+        :param target: int
+            Wanted 16-bit relays mask, bit n-1 is relay n
+        :param allow_glitch: bool
+            Allow plans which briefly switch relays that should stay as they are
+        :return: RelayMask
+            Relays state after commands
+        """
+
+        commands = self.mask_commands(self.refresh(), target, allow_glitch=allow_glitch)
+        answers = self.send_batch([encode(relay, command) for relay, command in commands] + [encode(0, STATE)])
+
+        if answers[-1] is None:
+            raise FrameError("Broken answer on state request")
+
+        mask = RelayMask.from_reply(answers[-1])
+
+        if self.history is not None:
+            self.history.record(mask)
+
+        return mask
+
+    def state(self, relay: int, max_age: float = None) -> bool:
         """
         Get relay status as boolean
 
@@ -75,26 +692,13 @@ class UsrR16:
 
         :param relay: int
             Relay's id
+        :param max_age: float
+            Max age of the cached state in seconds, default cache_ttl
         :return: bool
             Is this relay turned on
         """
 
-        # mask for each I/O point, to find state and returned state with mask[n]
-        mask = [0x00, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80]
-
-        resp = self.send_recv(self.req_gen(relay=relay, command=0x0a))
-
-        # About resp
-        # Get the 6th byte of the message if relay < 9 else 7th byte
-        # b'\xaa\x55\x00\x04\x00\x81\x08\x00\x8d'
-        #                            ^ or ^
-
-        if relay < 9:
-            mask_byte = resp[6]
-        else:
-            mask_byte = resp[7]
-
-        return mask_byte & mask[relay] == mask[relay]
+        return self.state_all(max_age=max_age)[relay]
 
     def turn_off(self, relay: int):
         """
@@ -104,7 +708,7 @@ class UsrR16:
             Relay's id
         """
 
-        self.send_recv(self.req_gen(relay=relay, command=1))
+        self.request(relay=relay, command=1)
 
     def turn_on(self, relay: int):
         """
@@ -114,7 +718,7 @@ class UsrR16:
             Relay's id
         """
 
-        self.send_recv(self.req_gen(relay=relay, command=2))
+        self.request(relay=relay, command=2)
 
     def invert(self, relay: int):
         """
@@ -124,7 +728,7 @@ class UsrR16:
             Relay's id
         """
 
-        self.send_recv(self.req_gen(relay=relay, command=3))
+        self.request(relay=relay, command=3)
 
     def turn_off_all(self):
         """
@@ -132,4 +736,65 @@ class UsrR16:
 
         """
 
-        self.send_recv(self.req_gen(relay=0, command=5))
+        self.request(relay=0, command=5)
+
+    def pulse(self, relay: int, duration: float, on: bool = True) -> Pulse:
+        """
+        Switch relay and switch it back after `duration` seconds, without blocking
+
+        Switching back is done by the shared scheduler (self.scheduler or
+        timers.default_scheduler()), so many pulses can run at once.
+        A new pulse on the same relay replaces the previous one, if switching
+        fails, the previous pulse stays and still switches the relay back.
+
+        pulse = r16.pulse(3, 5.0)
+        pulse.extend(2.0)
+        pulse.cancel(revert=True)
+
+        :param relay: int
+            Relay's id
+        :param duration: float
+            Seconds before switching back
+        :param on: bool
+            Turn relay on for the pulse (default), or off
+        :return: Pulse
+        """
+
+        previous = self._pulses.get(relay)
+        if previous is not None and not previous.active:
+            previous = None
+
+        switch = self.turn_on if on else self.turn_off
+
+        # previous pulse is cancelled only after the switch succeeded,
+        # if it fails, the relay is still switched back by the previous pulse
+        switch(relay)
+        if previous is not None and not previous.cancel():
+            # previous pulse has switched the relay back meanwhile
+            switch(relay)
+
+        pulse = Pulse(self, relay, on, duration, self.scheduler if self.scheduler is not None else default_scheduler())
+        self._pulses[relay] = pulse
+        return pulse
+
+    def watch(self, min_interval: float = 0.1, max_interval: float = 2.0, backoff: float = 1.5) -> Watcher:
+        """
+        Get the relays state watcher of this device, one for all consumers.
+        Arguments apply to the first call only, when the watcher is created.
+
+        r16.watch().subscribe(lambda changes, mask: print(changes))
+
+        :param min_interval: float
+            Poll interval after a change, seconds, default 0.1
+        :param max_interval: float
+            Poll interval of a quiet board, seconds, default 2.0
+        :param backoff: float
+            Interval growth per quiet poll, default 1.5
+        :return: Watcher
+        """
+
+        with self._watcher_lock:
+            if self._watcher is None:
+                self._watcher = Watcher(self, min_interval=min_interval, max_interval=max_interval, backoff=backoff)
+            return self._watcher
+
@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# One relay switched between two polls
+#   old, new - relay states, True is on
+#   time     - time.time() of the poll which noticed the change
+RelayChange = namedtuple('RelayChange', ['relay', 'old', 'new', 'time'])
+
+
+def diff(old: int, new: int, at: float = None) -> list:
+    """
+    Relays switched between two masks
+
+    :param old: int
+        Previous 16-bit relays mask
+    :param new: int
+        Current 16-bit relays mask
+    :param at: float
+        Time of the change, default time.time()
+    :return: list
+        RelayChange for each switched relay
+    """
+
+    at = time.time() if at is None else at
+    bits = old ^ new
+    return [RelayChange(i + 1, bool(old >> i & 1), bool(new >> i & 1), at) for i in range(16) if bits >> i & 1]
+
+
+class Watcher:
+    def __init__(self, r16, min_interval: float = 0.1, max_interval: float = 2.0, backoff: float = 1.5):
+        """
+        Polls the whole board by one request and notifies subscribers about
+        switched relays. Use UsrR16.watch to get the watcher shared by all
+        consumers of a board.
+
+        Poll interval drops to `min_interval` after a change and grows by
+        `backoff` times after each quiet poll, up to `max_interval`.
+
+        watcher = r16.watch()
+        watcher.subscribe(lambda changes, mask: print(changes))
+
+        async for change in watcher.events():
+            print(change.relay, change.old, change.new)
+
+        :param r16: UsrR16
+            Device to watch
+        :param min_interval: float
+            Poll interval after a change, seconds, default 0.1
+        :param max_interval: float
+            Poll interval of a quiet board, seconds, default 2.0
+        :param backoff: float
+            Interval growth per quiet poll, default 1.5
+        """
+
+        self.r16 = r16
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.mask = None
+        self.error = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, callback):
+        """
+        Call `callback(changes, mask)` after each poll which noticed changes,
+        callbacks are called from the watcher thread. Starts the watcher.
+
+        :param callback: callable
+            changes - list of RelayChange, mask - RelayMask after changes
+        :return: callable
+            The callback, to unsubscribe it later
+        """
+
+        with self._lock:
+            self._callbacks.append(callback)
+
+        self.start()
+        return callback
+
+    def unsubscribe(self, callback):
+        """
+        Stop calling the callback
+
+        :param callback: callable
+        """
+
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    async def events(self):
+        """
+        Async iterator of RelayChange, one for each switched relay
+
+        async for change in watcher.events():
+            ...
+        """
+
+        import asyncio  # not needed by threaded users, keeps import fast
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def push(changes, mask):
+            loop.call_soon_threadsafe(queue.put_nowait, changes)
+
+        self.subscribe(push)
+        try:
+            while True:
+                for change in await queue.get():
+                    yield change
+        finally:
+            self.unsubscribe(push)
+
+    def start(self):
+        """
+        Start polling in background thread, no-op if running
+        """
+
+        with self._lock:
+            if self.running:
+                return
+
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"usrr16-watcher-{self.r16.host}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stop polling
+        """
+
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def poll(self) -> list:
+        """
+        Read relays state once and notify subscribers if it has changed
+
+        :return: list
+            RelayChange for each switched relay
+        """
+
+        mask = self.r16.refresh()
+        changes = [] if self.mask is None else diff(self.mask, mask)
+        self.mask = mask
+
+        if changes:
+            with self._lock:
+                callbacks = list(self._callbacks)
+
+            for callback in callbacks:
+                try:
+                    callback(changes, mask)
+                except Exception:
+                    logger.exception("Watcher callback %r failed", callback)
+
+        return changes
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                changed = bool(self.poll())
+                self.error = None
+            except (OSError, ValueError) as e:
+                changed = False
+                self.error = e
+
+            if changed:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+
+            self._stop.wait(self.interval)
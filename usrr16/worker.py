@@ -0,0 +1,220 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+
+from usrr16.codec import encode, FrameError, OFF, ON, INVERT, OFF_ALL, STATE
+from usrr16.usrr16 import RelayMask
+
+# Priority classes, lower goes first
+URGENT = 0      # safety commands, e.g. all off
+NORMAL = 1      # commands
+POLL = 2        # routine state reads
+
+
+class _Entry:
+    __slots__ = ('priority', 'seq', 'relay', 'command', 'futures', 'dropped')
+
+    def __init__(self, priority: int, seq: int, relay: int, command: int, futures: list):
+        self.priority = priority
+        self.seq = seq
+        self.relay = relay
+        self.command = command
+        self.futures = futures
+        self.dropped = False
+
+    def __lt__(self, other) -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class IOWorker:
+    def __init__(self, r16, max_batch: int = 16):
+        """
+        Dedicated thread owning the device session, callers submit commands
+        and get futures. Queued commands go by priority, many at once.
+
+        Redundant queued commands collapse into one:
+          - on/off of a relay replaces a queued on/off of the same relay
+          - all off (and whole board on/off) replaces all queued relay commands
+          - state reads share one request
+        Replaced commands' futures get the result of the command replacing them.
+        Commands of the same relay never overtake each other, whatever priority.
+
+        worker = IOWorker(r16)
+        worker.state_all(priority=POLL)
+        worker.turn_off_all().result()   # URGENT, goes before queued polls
+
+        :param r16: UsrR16
+            Device session, don't use it directly while the worker runs
+        :param max_batch: int
+            Max commands sent by one write, default 16
+        """
+
+        self.r16 = r16
+        self.max_batch = max_batch
+        self._heap = []
+        self._relays = {}   # relay -> queued entries of that relay in order, 0 - whole board
+        self._state = None  # queued state request
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"usrr16-io-{r16.host}", daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(1 for entry in self._heap if not entry.dropped)
+
+    def _push(self, entry: _Entry):
+        heapq.heappush(self._heap, entry)
+        self._cond.notify()
+
+    def _replace(self, old: _Entry, entry: _Entry):
+        old.dropped = True
+        entry.futures[:0] = old.futures
+        entry.priority = min(entry.priority, old.priority)
+
+    def submit(self, relay: int, command: int, priority: int = NORMAL) -> Future:
+        """
+        Queue a command
+
+        :param relay: int
+            Relay's id, 0 - all
+        :param command: int
+            1 - off, 2 - on, 3 - invert, 5 - all off, 10 - state
+        :param priority: int
+            URGENT, NORMAL or POLL
+        :return: Future
+            bool - device acknowledged the command, RelayMask for state request
+        """
+
+        encode(relay, command)  # validate now, not in the worker
+        future = Future()
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("IOWorker is closed")
+
+            entry = _Entry(priority, next(self._seq), relay, command, [future])
+
+            if command == STATE:
+                if self._state is not None:
+                    self._replace(self._state, entry)
+                self._state = entry
+                self._push(entry)
+                return future
+
+            queued = self._relays.setdefault(relay, [])
+
+            if relay == 0 and command in (OFF, ON, OFF_ALL):
+                # final state doesn't depend on anything queued before
+                for entries in self._relays.values():
+                    for old in entries:
+                        self._replace(old, entry)
+                    entries.clear()
+            else:
+                if queued and command in (ON, OFF) and queued[-1].command in (ON, OFF):
+                    self._replace(queued.pop(), entry)
+
+                # never overtake queued commands of the same relay
+                related = itertools.chain(*self._relays.values()) if relay == 0 else queued + self._relays.get(0, [])
+                for old in related:
+                    entry.priority = max(entry.priority, old.priority)
+
+            queued.append(entry)
+            self._push(entry)
+
+        return future
+
+    def turn_on(self, relay: int, priority: int = NORMAL) -> Future:
+        return self.submit(relay, ON, priority)
+
+    def turn_off(self, relay: int, priority: int = NORMAL) -> Future:
+        return self.submit(relay, OFF, priority)
+
+    def invert(self, relay: int, priority: int = NORMAL) -> Future:
+        return self.submit(relay, INVERT, priority)
+
+    def turn_off_all(self, priority: int = URGENT) -> Future:
+        return self.submit(0, OFF_ALL, priority)
+
+    def state_all(self, priority: int = POLL) -> Future:
+        return self.submit(0, STATE, priority)
+
+    def _take(self) -> list:
+        with self._cond:
+            while not self._closed and not any(not entry.dropped for entry in self._heap):
+                self._heap.clear()
+                self._cond.wait()
+
+            batch = []
+            while self._heap and len(batch) < self.max_batch:
+                entry = heapq.heappop(self._heap)
+                if entry.dropped:
+                    continue
+
+                batch.append(entry)
+                if entry is self._state:
+                    self._state = None
+                else:
+                    self._relays[entry.relay].remove(entry)
+
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take()
+            if not batch:
+                return
+
+            try:
+                answers = self.r16.send_batch([encode(entry.relay, entry.command) for entry in batch])
+            except Exception as e:
+                for entry in batch:
+                    for future in entry.futures:
+                        future.set_exception(e)
+                continue
+
+            for entry, answer in zip(batch, answers):
+                result, error = answer is not None, None
+                if entry.command == STATE:
+                    try:
+                        if answer is None:
+                            raise FrameError("Broken answer on state request")
+                        result = RelayMask.from_reply(answer)
+                    except FrameError as e:
+                        error = e
+
+                for future in entry.futures:
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(error)
+
+    def close(self, cancel: bool = True):
+        """
+        Stop the worker. The device session stays open.
+
+        :param cancel: bool
+            Cancel queued commands (default), or send them before stopping
+        """
+
+        with self._cond:
+            self._closed = True
+            if cancel:
+                for entry in self._heap:
+                    if not entry.dropped:
+                        for future in entry.futures:
+                            future.cancel()
+                self._heap.clear()
+                self._relays.clear()
+                self._state = None
+            self._cond.notify()
+
+        self._thread.join()
+
+    def __enter__(self) -> "IOWorker":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()